@@ -0,0 +1,153 @@
+"""
+Per-user training analytics, computed for every exercise in one pass.
+
+Weight history and set progress are flattened into DataFrames once; e1RM,
+PR timelines, trend slopes and weekly volume per muscle group then come
+out of vectorized pandas/numpy ops instead of per-exercise loops. Results
+are cached per user and reused until either source file gets a new
+version; the cache keeps the WORKOUT_USER_CACHE_ENTRIES most recently
+used users.
+"""
+
+import numpy as np
+import pandas as pd
+
+from exercises import get_catalog, get_catalog_version
+from helpers import (
+    USER_CACHE_MAX_ENTRIES,
+    get_all_exercises,
+    get_data_version,
+    load_weight_history,
+    load_set_progress,
+)
+from utils.lru import LRUCache
+
+# Midpoint of each phase's rep range (Build, Strength, Hypertrophy, Deload)
+PHASE_REPS = {1: 5, 2: 7, 3: 9, 4: 13.5}
+E1RM_REPS = PHASE_REPS[1]  # weights are logged during the Week 1 build phase
+DELOAD_FACTOR = 0.5
+
+
+def _exercise_groups():
+    groups = {}
+    for group, exercises in get_catalog().groups.items():
+        for name, _ in exercises:
+            groups.setdefault(name, group)
+    return groups
+
+
+# =========================
+# Flattening
+# =========================
+
+def history_frame(weight_history):
+    """[exercise, date, weight] rows, sorted by exercise then date."""
+    rows = [
+        (exercise, entry.get("date"), entry.get("weight"))
+        for exercise, entries in weight_history.items()
+        for entry in entries
+    ]
+    df = pd.DataFrame(rows, columns=["exercise", "date", "weight"])
+    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    df["weight"] = pd.to_numeric(df["weight"], errors="coerce")
+    df = df.dropna(subset=["date", "weight"])
+    return df.sort_values(["exercise", "date"], kind="stable").reset_index(drop=True)
+
+
+def sets_frame(set_progress):
+    """[week, day, exercise, sets_done] rows from {"week{W}_day{D}": {exercise: [bools]}}."""
+    rows = []
+    for key, exercises in set_progress.items():
+        try:
+            week_part, day_part = key.split("_")
+            week, day = int(week_part[4:]), int(day_part[3:])
+        except ValueError:
+            continue
+        for exercise, sets in exercises.items():
+            rows.append((week, day, exercise, sum(bool(s) for s in sets)))
+    return pd.DataFrame(rows, columns=["week", "day", "exercise", "sets_done"])
+
+
+# =========================
+# Batch computations
+# =========================
+
+def compute_analytics(weight_history, set_progress):
+    """
+    Returns {"summary", "pr_timeline", "weekly_volume"} DataFrames:
+      summary        one row per exercise: group, entries, current, pr, e1rm,
+                     slope (lbs/week), first/last date
+      pr_timeline    every history entry with running max and an is_pr flag
+      weekly_volume  sets × reps × load, weeks as rows, muscle groups as columns
+    """
+    groups = _exercise_groups()
+    hist = history_frame(weight_history)
+
+    hist["e1rm"] = hist["weight"] * (1 + E1RM_REPS / 30)  # Epley
+    by_ex = hist.groupby("exercise", sort=True)
+    hist["running_max"] = by_ex["weight"].cummax()
+    prev_max = by_ex["running_max"].shift()
+    hist["is_pr"] = prev_max.isna() | (hist["weight"] > prev_max)
+
+    # Least-squares slope per exercise from grouped sums (no per-exercise polyfit)
+    x = (hist["date"] - pd.Timestamp("1970-01-01")).dt.total_seconds() / (7 * 86400)
+    y = hist["weight"]
+    sums = pd.DataFrame({
+        "exercise": hist["exercise"], "x": x, "y": y, "xx": x * x, "xy": x * y,
+    }).groupby("exercise").sum()
+    n = by_ex.size()
+    denom = n * sums["xx"] - sums["x"] ** 2
+    slope = (n * sums["xy"] - sums["x"] * sums["y"]) / denom.replace(0, np.nan)
+
+    summary = pd.DataFrame({
+        "group": [groups.get(ex, "Other") for ex in n.index],
+        "entries": n,
+        "current": by_ex["weight"].last(),
+        "pr": by_ex["weight"].max(),
+        "e1rm": by_ex["e1rm"].max().round(1),
+        "slope": slope.fillna(0.0).round(2),
+        "first_date": by_ex["date"].min(),
+        "last_date": by_ex["date"].max(),
+    })
+
+    # Weekly volume: current load (latest logged, else catalog default) per exercise
+    sets = sets_frame(set_progress)
+    base = pd.to_numeric(pd.Series(get_all_exercises(), dtype=object), errors="coerce")
+    load = summary["current"].combine_first(base)
+    sets["load"] = sets["exercise"].map(load).fillna(0.0)
+    sets["load"] = np.where(sets["week"] == 4, sets["load"] * DELOAD_FACTOR, sets["load"])
+    sets["volume"] = sets["sets_done"] * sets["week"].map(PHASE_REPS).fillna(0) * sets["load"]
+    sets["group"] = sets["exercise"].map(groups).fillna("Other")
+    weekly_volume = sets.pivot_table(
+        index="week", columns="group", values="volume", aggfunc="sum", fill_value=0.0
+    )
+
+    return {
+        "summary": summary,
+        "pr_timeline": hist[["exercise", "date", "weight", "running_max", "is_pr"]],
+        "weekly_volume": weekly_volume,
+    }
+
+
+# =========================
+# Cached per history version
+# =========================
+
+_cache = LRUCache(USER_CACHE_MAX_ENTRIES)  # {user: ((history_version, setprogress_version, catalog_version), result)}
+
+
+def get_user_analytics(user):
+    version = (
+        get_data_version(user, "weight_history"),
+        get_data_version(user, "setprogress"),
+        get_catalog_version(),
+    )
+    cached = _cache.get(user)
+    if cached is not None:
+        if cached[0] == version:
+            return cached[1]
+        _cache.pop(user, None)  # don't hold the stale result while recomputing
+
+    result = compute_analytics(load_weight_history(user), load_set_progress(user))
+    _cache[user] = (version, result)
+    return result
@@ -0,0 +1,266 @@
+"""
+Lightweight JSON HTTP API over the helpers, for quick check-ins from
+mobile/watch clients without a full Streamlit rerun.
+
+    python api_server.py [--host 0.0.0.0] [--port 8502]
+
+Endpoints (all JSON):
+    GET    /users/{user}/day?week=W&day=D[&team=T|schedule_key=K]   day plan
+    GET    /users/{user}/workouts                             completed workouts
+    POST   /users/{user}/workouts/{week}/{day}                mark_workout_done
+    DELETE /users/{user}/workouts/{week}/{day}                unmark_workout_done
+    PUT    /users/{user}/weights/{exercise}   {"weight": x}   update_weight
+    PUT    /users/{user}/sets/{week}/{day}    {"exercise", "set", "done"}
+    GET    /leaderboard[?window=This cycle]
+
+HTTP/1.1 keep-alive is on, GET responses carry an ETag and honour
+If-None-Match, and every response reports its handler time in a
+Server-Timing header.
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import re
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from helpers import (
+    get_all_users,
+    get_day_plan,
+    load_progress,
+    mark_workout_done,
+    unmark_workout_done,
+    update_weight,
+    set_set_done,
+)
+from partitioning import routing_key
+from standings import WINDOWS, build_progress_snapshot
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _int_param(value, name, low=1, high=4):
+    try:
+        n = int(value)
+    except (TypeError, ValueError):
+        raise ApiError(400, f"'{name}' must be an integer")
+    if not low <= n <= high:
+        raise ApiError(400, f"'{name}' must be between {low} and {high}")
+    return n
+
+
+def _name_param(value, name):
+    """A user / schedule key that is safe to build a file path from."""
+    if (not value or "/" in value or "\\" in value or ".." in value
+            or value.startswith(".") or "\x00" in value):
+        raise ApiError(400, f"'{name}' is not a valid name")
+    return value
+
+
+# =========================
+# Handlers: (match groups, query, body) -> JSON-able result
+# =========================
+
+def get_day(user, query, body):
+    user = _name_param(user, "user")
+    week = _int_param(query.get("week"), "week")
+    day = _int_param(query.get("day"), "day")
+    # Same rule the router partitions by, so a team member gets the team's schedule
+    schedule_key = _name_param(
+        routing_key(user, query.get("team") or query.get("schedule_key")), "schedule_key"
+    )
+    return {
+        "week": week,
+        "day": day,
+        "schedule_key": schedule_key,
+        "plan": get_day_plan(user, schedule_key, week, day),
+    }
+
+
+def get_workouts(user, query, body):
+    user = _name_param(user, "user")
+    return {"user": user, "workouts": load_progress(user)}
+
+
+def post_workout(user, week, day, query, body):
+    user = _name_param(user, "user")
+    week, day = _int_param(week, "week"), _int_param(day, "day")
+    mark_workout_done(user, week, day)
+    return {"user": user, "week": week, "day": day, "done": True}
+
+
+def delete_workout(user, week, day, query, body):
+    user = _name_param(user, "user")
+    week, day = _int_param(week, "week"), _int_param(day, "day")
+    unmark_workout_done(user, week, day)
+    return {"user": user, "week": week, "day": day, "done": False}
+
+
+def put_weight(user, exercise, query, body):
+    user = _name_param(user, "user")
+    try:
+        weight = float(body["weight"])
+    except (KeyError, TypeError, ValueError):
+        raise ApiError(400, "body must be {\"weight\": <number>}")
+    if not math.isfinite(weight):
+        raise ApiError(400, "'weight' must be a finite number")
+    update_weight(user, exercise, weight)
+    return {"user": user, "exercise": exercise, "weight": weight}
+
+
+def put_set(user, week, day, query, body):
+    user = _name_param(user, "user")
+    week, day = _int_param(week, "week"), _int_param(day, "day")
+    exercise = body.get("exercise")
+    if not exercise:
+        raise ApiError(400, "body needs 'exercise'")
+    set_index = _int_param(body.get("set"), "set", 1, 10) - 1
+    sets = set_set_done(user, week, day, exercise, set_index, bool(body.get("done", True)))
+    return {"user": user, "week": week, "day": day, "exercise": exercise, "sets": sets}
+
+
+def get_leaderboard(query, body):
+    window = query.get("window") or "This cycle"
+    if window not in WINDOWS:
+        raise ApiError(400, f"'window' must be one of {list(WINDOWS)}")
+    snapshot = build_progress_snapshot(get_all_users(), window)
+    rows = sorted(snapshot.items(), key=lambda item: (-item[1]["window"], item[0].lower()))
+    return {"window": window, "rows": [{"user": u, **data} for u, data in rows]}
+
+
+ROUTES = [
+    ("GET",    re.compile(r"^/users/([^/]+)/day$"), get_day),
+    ("GET",    re.compile(r"^/users/([^/]+)/workouts$"), get_workouts),
+    ("POST",   re.compile(r"^/users/([^/]+)/workouts/(\d+)/(\d+)$"), post_workout),
+    ("DELETE", re.compile(r"^/users/([^/]+)/workouts/(\d+)/(\d+)$"), delete_workout),
+    ("PUT",    re.compile(r"^/users/([^/]+)/weights/([^/]+)$"), put_weight),
+    ("PUT",    re.compile(r"^/users/([^/]+)/sets/(\d+)/(\d+)$"), put_set),
+    ("GET",    re.compile(r"^/leaderboard$"), get_leaderboard),
+]
+
+
+# =========================
+# HTTP plumbing
+# =========================
+
+class ApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    server_version = "WorkoutAPI/1.0"
+    disable_nagle_algorithm = True  # headers and body go out as separate writes
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status, payload, started, etag=None):
+        body = b"" if payload is None else json.dumps(payload, separators=(",", ":")).encode()
+        self.send_response(status)
+        if payload is not None:
+            self.send_header("Content-Type", "application/json")
+        if etag:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Server-Timing", f"app;dur={(time.perf_counter() - started) * 1000:.3f}")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _dispatch(self, method):
+        started = time.perf_counter()
+        url = urlsplit(self.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        try:
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+            except ValueError:
+                self.close_connection = True  # can't tell where the body ends
+                raise ApiError(400, "bad Content-Length")
+            raw = self.rfile.read(length) if length > 0 else b""
+            try:
+                body = json.loads(raw) if raw else {}
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                raise ApiError(400, "body must be JSON")
+            if not isinstance(body, dict):
+                raise ApiError(400, "body must be a JSON object")
+
+            path_matched = False
+            for route_method, pattern, handler in ROUTES:
+                match = pattern.match(url.path)
+                if not match:
+                    continue
+                path_matched = True
+                if route_method != method:
+                    continue
+                result = handler(*(unquote(g) for g in match.groups()), query, body)
+                break
+            else:
+                raise ApiError(405 if path_matched else 404,
+                               "method not allowed" if path_matched else "not found")
+        except ApiError as e:
+            self._send(e.status, {"error": e.message}, started)
+            return
+        except Exception as e:
+            # Always answer: a dropped connection looks like a network fault to clients
+            self._send(500, {"error": f"internal error: {type(e).__name__}"}, started)
+            return
+
+        if method != "GET":
+            self._send(200, result, started)
+            return
+
+        etag = '"' + hashlib.sha1(json.dumps(result, sort_keys=True).encode()).hexdigest() + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self._send(304, None, started, etag)
+        else:
+            self._send(200, result, started, etag)
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_PUT(self):
+        self._dispatch("PUT")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+
+def make_server(host="127.0.0.1", port=8502, verbose=False):
+    server = ThreadingHTTPServer((host, port), ApiHandler)
+    server.daemon_threads = True
+    server.verbose = verbose
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="JSON API for workout check-ins.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    server = make_server(args.host, args.port, args.verbose)
+    print(f"Serving workout API on http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,16 +3,22 @@ sys.path.append(os.path.dirname(__file__))
 
 import streamlit as st
 from utils.login import login_user
+from utils.perf import timed, timing_summary, get_status
 from views.daily_workout import show_daily_workout
 from views.full_schedule import show_full_schedule
 from views.progress_tracker import show_progress_tracker
 from views.leaderboard import show_leaderboard
+from warmup import start_warmup
 
 # --- Streamlit Page Setup ---
 st.set_page_config(page_title="Workout Scheduler", page_icon="💪", layout="wide")
 
+# --- Warm caches in the background (once per server process) ---
+start_warmup()
+
 # --- Login / Team Selection ---
-username, schedule_key = login_user()
+with timed("login"):
+    username, schedule_key = login_user()
 
 if not username:
     st.stop()
@@ -28,17 +34,24 @@ view_mode = st.sidebar.radio(
 )
 
 # --- Main Views ---
-if view_mode == "Daily Workout":
-    show_daily_workout(username, schedule_key)
+with timed(f"view:{view_mode}"):
+    if view_mode == "Daily Workout":
+        show_daily_workout(username, schedule_key)
+
+    elif view_mode == "Full 4-Week Schedule":
+        show_full_schedule(username, schedule_key)
 
-elif view_mode == "Full 4-Week Schedule":
-    show_full_schedule(username, schedule_key)
+    elif view_mode == "Progress Tracker":
+        show_progress_tracker(username)
 
-elif view_mode == "Progress Tracker":
-    show_progress_tracker(username)
+    elif view_mode == "Leaderboard":
+        show_leaderboard(username)
 
-elif view_mode == "Leaderboard":
-    show_leaderboard(username)
+    else:
+        st.error("Unknown view selected. Please reload the page.")
 
-else:
-    st.error("Unknown view selected. Please reload the page.")
+# --- Instrumentation (opt-in) ---
+if os.environ.get("WORKOUT_SHOW_TIMINGS") == "1":
+    with st.sidebar.expander("⏱ Rerun timings"):
+        st.json(timing_summary())
+        st.json(get_status())
@@ -0,0 +1,132 @@
+"""
+Load test for api_server.py.
+
+    python benchmarks/api_load.py [--clients 16] [--requests 500] [--users 50]
+    python benchmarks/api_load.py --url http://host:8502   # against a running server
+
+Without --url it starts the API in-process on an ephemeral port, inside a
+throwaway data directory. Each client thread keeps one keep-alive
+connection and cycles through check-in, set toggle, day plan (with
+If-None-Match) and leaderboard requests. Reports throughput plus client
+latency and server handler time (from Server-Timing) percentiles per
+endpoint.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import quote, urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+
+def _pct(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p / 100 * len(values)))]
+
+
+def _client(host, port, client_id, n_requests, n_users, stats, lock):
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    etags = {}
+    local = []
+    for i in range(n_requests):
+        user = f"user{(client_id * 7 + i) % n_users}"
+        week, day = 1 + i % 4, 1 + (i // 4) % 4
+        kind = i % 4
+        headers = {"Content-Type": "application/json"}
+        body = None
+        if kind == 0:
+            name, method, path = "check-in", "POST", f"/users/{user}/workouts/{week}/{day}"
+        elif kind == 1:
+            name, method, path = "set", "PUT", f"/users/{user}/sets/{week}/{day}"
+            body = json.dumps({"exercise": "Squat", "set": 1 + i % 3, "done": i % 2 == 0})
+        elif kind == 2:
+            name, method, path = "day", "GET", f"/users/{user}/day?week={week}&day={day}"
+        else:
+            name, method, path = "leaderboard", "GET", "/leaderboard?window=" + quote("Last 7 days")
+        if method == "GET" and path in etags:
+            headers["If-None-Match"] = etags[path]
+
+        started = time.perf_counter()
+        conn.request(method, path, body=body, headers=headers)
+        resp = conn.getresponse()
+        resp.read()
+        elapsed = (time.perf_counter() - started) * 1000
+
+        timing = resp.getheader("Server-Timing", "app;dur=0").split("dur=")[-1]
+        if resp.getheader("ETag"):
+            etags[path] = resp.getheader("ETag")
+        local.append((name, resp.status, elapsed, float(timing)))
+    conn.close()
+    with lock:
+        stats.extend(local)
+
+
+def run(url, clients, n_requests, n_users):
+    parts = urlsplit(url)
+    stats, lock = [], threading.Lock()
+    threads = [
+        threading.Thread(
+            target=_client,
+            args=(parts.hostname, parts.port, c, n_requests, n_users, stats, lock),
+        )
+        for c in range(clients)
+    ]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - started
+
+    print(f"{len(stats)} requests from {clients} keep-alive clients in {wall:.2f}s "
+          f"→ {len(stats) / wall:.0f} req/s")
+    print(f"{'endpoint':12s} {'n':>6s} {'errors':>6s} {'304s':>5s} "
+          f"{'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s} {'server p50':>10s}")
+    for name in ["check-in", "set", "day", "leaderboard"]:
+        rows = [s for s in stats if s[0] == name]
+        lat = [s[2] for s in rows]
+        server = [s[3] for s in rows]
+        errors = sum(1 for s in rows if s[1] >= 400)
+        not_modified = sum(1 for s in rows if s[1] == 304)
+        print(f"{name:12s} {len(rows):6d} {errors:6d} {not_modified:5d} "
+              f"{_pct(lat, 50):8.2f} {_pct(lat, 95):8.2f} {_pct(lat, 99):8.2f} "
+              f"{statistics.median(server) if server else 0:10.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", help="target a running server instead of an in-process one")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=500, help="requests per client")
+    parser.add_argument("--users", type=int, default=50)
+    args = parser.parse_args()
+
+    if args.url:
+        run(args.url, args.clients, args.requests, args.users)
+        return
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        os.chdir(data_dir)  # helpers keeps its data relative to the cwd
+        from api_server import make_server
+
+        server = make_server(port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            run(f"http://127.0.0.1:{server.server_port}", args.clients, args.requests, args.users)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == "__main__":
+    main()
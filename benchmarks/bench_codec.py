@@ -0,0 +1,72 @@
+"""
+Compare on-disk size and load time of the storage codecs.
+
+    python benchmarks/bench_codec.py [--exercises 60] [--entries 200] [--repeat 200]
+
+Builds a synthetic weights map and weight history shaped like the real
+files, writes each through every codec and times open + read + decode.
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import codec
+
+CODECS = ["legacy", "json", "zlib", "records", "auto"]
+
+
+def make_weights(n_exercises):
+    return {f"Exercise {i}": float(random.randrange(10, 200, 5)) for i in range(n_exercises)}
+
+
+def make_history(n_exercises, n_entries):
+    return {
+        f"Exercise {i}": [
+            {"date": f"2025-{1 + j % 12:02d}-{1 + j % 28:02d} 18:{j % 60:02d}",
+             "weight": float(random.randrange(10, 200, 5))}
+            for j in range(n_entries)
+        ]
+        for i in range(n_exercises)
+    }
+
+
+def bench(label, data, repeat, tmp_dir):
+    print(f"\n{label}")
+    print(f"{'codec':10s} {'bytes':>10s} {'load µs':>10s}")
+    for name in CODECS:
+        raw = codec.encode(data, name)
+        path = os.path.join(tmp_dir, f"{label}_{name}.json")
+        with open(path, "wb") as f:
+            f.write(raw)
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            with open(path, "rb") as f:
+                codec.decode(f.read())
+        elapsed = (time.perf_counter() - start) / repeat
+
+        note = "" if codec.decode(raw) == data else "  (lossy: falls back / converts types)"
+        print(f"{name:10s} {len(raw):10d} {elapsed * 1e6:10.1f}{note}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--exercises", type=int, default=60)
+    parser.add_argument("--entries", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    random.seed(0)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        bench("weights", make_weights(args.exercises), args.repeat, tmp_dir)
+        bench("weight_history", make_history(args.exercises, args.entries), args.repeat, tmp_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Per-session memory for schedule state: private dict copies vs. shared
+copy-on-write ScheduleViews.
+
+    python benchmarks/bench_session_memory.py [--sessions 1000] [--teams 20]
+
+Builds synthetic team schedules in a throwaway data directory, then opens
+N sessions spread across the teams two ways and measures the retained
+allocations with tracemalloc:
+  copies   each session keeps its own normalized schedule dict (old behaviour)
+  shared   each session keeps a ScheduleView over the interned team schedule
+"""
+
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _normalized_copy(raw):
+    """What show_daily_workout used to keep in st.session_state per session."""
+    normalized = {}
+    for w_key, days in raw.items():
+        normalized[int(w_key)] = {int(d): dict(plan) for d, plan in days.items()}
+    return normalized
+
+
+def _measure(make_session, n_sessions, teams):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    sessions = [make_session(i, teams[i % len(teams)]) for i in range(n_sessions)]
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    retained = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    return sessions, retained
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--teams", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        os.chdir(data_dir)  # helpers keeps its data relative to the cwd
+        from helpers import (
+            build_user_day_from_base,
+            generate_base_day,
+            load_user_schedule,
+            save_user_schedule,
+        )
+        from shared_schedules import ScheduleView, get_shared_schedule
+
+        teams = [f"team{t}" for t in range(args.teams)]
+        for team in teams:
+            schedule = {
+                str(w): {str(d): build_user_day_from_base(generate_base_day(w, d), w, team)
+                         for d in range(1, 5)}
+                for w in range(1, 5)
+            }
+            save_user_schedule(team, schedule)
+            get_shared_schedule(team)  # intern up front, like a warm server
+
+        copies, copies_bytes = _measure(
+            lambda i, team: _normalized_copy(load_user_schedule(team)), args.sessions, teams
+        )
+        del copies
+        views, shared_bytes = _measure(
+            lambda i, team: ScheduleView(team, f"member{i}"), args.sessions, teams
+        )
+
+        print(f"{args.sessions} sessions over {args.teams} teams")
+        print(f"{'mode':8s} {'total KiB':>10s} {'per session B':>14s}")
+        for mode, total in [("copies", copies_bytes), ("shared", shared_bytes)]:
+            print(f"{mode:8s} {total / 1024:10.1f} {total / args.sessions:14.0f}")
+        del views
+
+
+if __name__ == "__main__":
+    main()
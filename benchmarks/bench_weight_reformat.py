@@ -0,0 +1,100 @@
+"""
+Cost of refreshing stored schedule text after a weight change: re-format
+only the affected cells (update_weight) vs. regenerating every day.
+
+    python benchmarks/bench_weight_reformat.py [--groups 6,60,600] [--repeat 20]
+
+Builds one individual schedule per size in a throwaway data directory,
+with GROUPS cells per day over 4 weeks x 4 days, one exercise shown in
+one cell per day. It then changes that exercise's weight REPEAT times
+and reports, per update, how many cells were formatted and how long
+reformat_schedule_cells took. The full regeneration formats every cell,
+so its cost grows with schedule size; the incremental path formats a
+constant 16. Both still rewrite the whole file, as every save does.
+tests/test_reformat_cells.py asserts that behaviour.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _schedule(names, groups, weeks=range(1, 5), days=range(1, 5)):
+    """{week: {day: {group: text}}}; group 0 always shows names[0]."""
+    return {
+        str(w): {
+            str(d): {f"Group {g}": f"{names[1 + (g + d) % (len(names) - 1) if g else 0]} — 100 lbs" for g in range(groups)}
+            for d in days
+        }
+        for w in weeks
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--groups", default="6,60,600")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        os.chdir(data_dir)  # helpers keeps its data relative to the cwd
+        import progression
+        from helpers import (
+            build_user_day_from_base,
+            get_all_exercises,
+            reformat_schedule_cells,
+            save_user_schedule,
+            save_weights,
+        )
+
+        formatted = [0]
+        prescription_text = progression.prescription_text
+
+        def counting(*a):
+            formatted[0] += 1
+            return prescription_text(*a)
+
+        progression.prescription_text = counting
+        names = sorted(get_all_exercises())
+        target = names[0]
+
+        print(f"{'cells':>6s} {'mode':12s} {'formatted/update':>17s} {'ms/update':>10s}")
+        for groups in [int(g) for g in args.groups.split(",")]:
+            user = f"lifter{groups}"
+            schedule = _schedule(names, groups)
+            save_user_schedule(user, schedule)
+            reformat_schedule_cells(user, target)  # builds the index once
+
+            formatted[0] = 0
+            started = time.perf_counter()
+            for i in range(args.repeat):
+                save_weights(user, {target: 100.0 + 5 * (i + 1)})
+                reformat_schedule_cells(user, target)
+            incremental = (time.perf_counter() - started) / args.repeat
+            incremental_cells = formatted[0] / args.repeat
+
+            started = time.perf_counter()
+            for i in range(args.repeat):
+                save_weights(user, {target: 200.0 + 5 * (i + 1)})
+                progression.prescription_text = prescription_text
+                regenerated = {
+                    w: {d: build_user_day_from_base(
+                            {g: t.split(" — ")[0] for g, t in plan.items()}, int(w), user)
+                        for d, plan in days.items()}
+                    for w, days in schedule.items()
+                }
+                save_user_schedule(user, regenerated)
+            full = (time.perf_counter() - started) / args.repeat
+            progression.prescription_text = counting
+
+            cells = 16 * groups
+            print(f"{cells:6d} {'incremental':12s} {incremental_cells:17.0f} {incremental * 1000:10.2f}")
+            print(f"{cells:6d} {'regenerate':12s} {cells:17d} {full * 1000:10.2f}")
+
+
+if __name__ == "__main__":
+    main()
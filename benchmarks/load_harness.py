@@ -0,0 +1,184 @@
+"""
+Concurrent-session load harness for the Streamlit app.
+
+    python benchmarks/load_harness.py [--users 200] [--concurrency 32] [--steps 12]
+
+Spins up one streamlit.testing AppTest session per simulated user inside
+a throwaway data directory. Sessions run concurrently on a process pool,
+because AppTest's mocked runtime is a per-process singleton; the workers
+share the data directory the way several server processes would.
+Each user logs in through utils/login.login_user (about half join a
+shared team via "Create New Team"), then performs a random walk over
+the four views in app.py: toggling sets and marking workouts done on the
+daily page, and opening the full schedule, the progress tracker and the
+leaderboard.
+
+Reports p50/p95/p99 rerun latency per view, the number of reruns that
+raised, and lost updates: set toggles or check-ins a user made that are
+missing from storage afterwards.
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+APP_PATH = os.path.join(ROOT, "app.py")
+VIEWS = ["Daily Workout", "Full 4-Week Schedule", "Progress Tracker", "Leaderboard"]
+
+
+def _pct(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p / 100 * len(values)))]
+
+
+def _timed_run(at, samples, view, action):
+    started = time.perf_counter()
+    try:
+        action()
+        failed = bool(at.exception)
+    except Exception:
+        failed = True
+    samples.append((view, (time.perf_counter() - started) * 1000, failed))
+    return not failed
+
+
+def simulate_user(data_dir, user_id, steps, teams, seed):
+    """
+    Drive one session. Returns (username, expected set states, expected
+    check-ins, [(view, latency_ms, failed), ...]).
+    """
+    from streamlit.testing.v1 import AppTest
+
+    os.chdir(data_dir)
+    rng = random.Random(seed)
+    samples = []
+    username = f"sim{user_id}"
+    expected_sets = {}   # {checkbox key: bool}
+    expected_done = {}   # {(week, day): bool}
+
+    at = AppTest.from_file(APP_PATH, default_timeout=120)
+    _timed_run(at, samples, "Daily Workout", at.run)
+    _timed_run(at, samples, "Daily Workout", lambda: at.sidebar.text_input[0].set_value(username).run())
+    if teams and rng.random() < 0.5:
+        team = rng.choice(teams)
+        _timed_run(at, samples, "Daily Workout",
+                   lambda: at.sidebar.selectbox[0].set_value("Create New Team").run())
+        _timed_run(at, samples, "Daily Workout",
+                   lambda: at.sidebar.text_input[2].set_value(team).run())
+
+    view = "Daily Workout"
+    for _ in range(steps):
+        if rng.random() < 0.35:
+            view = rng.choice(VIEWS)
+            _timed_run(at, samples, view, lambda: at.sidebar.radio[0].set_value(view).run())
+            continue
+        if view != "Daily Workout" or at.exception:
+            _timed_run(at, samples, view, at.run)
+            continue
+
+        boxes = [cb for cb in at.checkbox]
+        if boxes and rng.random() < 0.7:
+            box = rng.choice(boxes)
+            new_value = not box.value
+            if _timed_run(at, samples, view, lambda: box.set_value(new_value).run()):
+                expected_sets[box.label, box.key] = new_value
+        else:
+            # By label: at.radio / at.selectbox also hold the sidebar's widgets
+            week = next((w.value for w in at.main.selectbox if w.label == "Select Week"), 1)
+            day = next((w.value for w in at.main.radio if w.label == "Select Day"), 1)
+            buttons = [b for b in at.button if b.label in ("🎉 I Did It!", "↩️ Undo")]
+            if buttons:
+                marking = buttons[0].label == "🎉 I Did It!"
+                if _timed_run(at, samples, view, lambda: buttons[0].click().run()):
+                    expected_done[week, day] = marking
+    # Pool workers exit via os._exit: commit any write-behind queue first
+    from helpers import flush_writes
+    flush_writes()
+    return username, expected_sets, expected_done, samples
+
+
+def count_lost_updates(results):
+    """Compare each user's last intended state with what ended up on disk."""
+    from helpers import clear_read_cache, load_progress, load_set_progress
+
+    clear_read_cache()
+    lost = 0
+    for username, expected_sets, expected_done, _ in results:
+        progress = load_progress(username)
+        for (week, day), done in expected_done.items():
+            lost += (f"Week {week} Day {day}" in progress) != done
+
+        set_progress = load_set_progress(username)
+        for (label, key), done in expected_sets.items():
+            # key = f"{group}_{exercise}_{week}_{day}_{i}", label = f"{exercise} – Set {i+1}"
+            *_, week, day, i = key.rsplit("_", 3)
+            exercise = label.rsplit(" – Set ", 1)[0]
+            stored = set_progress.get(f"week{week}_day{day}", {}).get(exercise, [False] * 3)
+            lost += bool(stored[int(i)]) != done
+    return lost
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--steps", type=int, default=12, help="interactions per user")
+    parser.add_argument("--teams", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        os.chdir(data_dir)  # synthetic data dir: helpers keeps data relative to the cwd
+        teams = [f"Team {t}" for t in range(args.teams)]
+
+        # AppTest replaces __main__ inside each worker, so hand the pool an
+        # importable reference rather than __main__.simulate_user
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        from load_harness import simulate_user as run_session
+
+        started = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=args.concurrency) as pool:
+            futures = [
+                pool.submit(run_session, data_dir, u, args.steps, teams, args.seed * 100_003 + u)
+                for u in range(args.users)
+            ]
+            results = []
+            crashed = 0
+            for f in futures:
+                try:
+                    results.append(f.result())
+                except Exception:
+                    crashed += 1
+        wall = time.perf_counter() - started
+
+        lost = count_lost_updates(results)
+
+    latencies = {view: [] for view in VIEWS}
+    errors = {view: 0 for view in VIEWS}
+    for *_, samples in results:
+        for view, ms, failed in samples:
+            latencies[view].append(ms)
+            errors[view] += failed
+
+    total = sum(len(v) for v in latencies.values())
+    print(f"{args.users} simulated users, concurrency {args.concurrency}: "
+          f"{total} reruns in {wall:.1f}s ({total / wall:.1f} reruns/s)")
+    print(f"{'view':22s} {'reruns':>7s} {'errors':>7s} {'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s}")
+    for view in VIEWS:
+        lat = latencies[view]
+        print(f"{view:22s} {len(lat):7d} {errors[view]:7d} "
+              f"{_pct(lat, 50):8.1f} {_pct(lat, 95):8.1f} {_pct(lat, 99):8.1f}")
+    print(f"crashed sessions: {crashed}   lost updates: {lost}")
+
+
+if __name__ == "__main__":
+    main()
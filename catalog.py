@@ -0,0 +1,120 @@
+"""
+Searchable exercise catalog: the built-in library plus each team's custom
+exercises (stored in custom_exercises.json).
+
+Each team gets an ExerciseIndex built once per custom-file and library version:
+  - a sorted list of every word suffix ("landmind row", "row") for
+    bisect-based prefix/typeahead matches on any word;
+  - a trigram → exercise-id inverted index for fuzzy matches, so
+    "landmine" still finds "Landmind Row".
+"""
+
+import bisect
+import threading
+
+from exercises import get_catalog
+from helpers import get_custom_exercises_version, load_custom_exercises
+
+
+def _trigrams(text):
+    padded = f"  {text.lower()} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class ExerciseIndex:
+    def __init__(self, entries):
+        """entries: {name: {"muscle_group": str, "default_weight": ...}}"""
+        self.entries = entries
+        self.names = sorted(entries, key=str.lower)
+        self._grams = [_trigrams(name) for name in self.names]
+
+        self.by_group = {}   # {muscle_group: [names, sorted]}
+        self._prefixes = []  # sorted (word-suffix, id)
+        self._by_gram = {}   # {trigram: [id, ...]}
+        for i, name in enumerate(self.names):
+            group = entries[name].get("muscle_group") or "Other"
+            self.by_group.setdefault(group, []).append(name)
+            words = name.lower().split()
+            for w in range(len(words)):
+                self._prefixes.append((" ".join(words[w:]), i))
+            for gram in self._grams[i]:
+                self._by_gram.setdefault(gram, []).append(i)
+        self._prefixes.sort()
+
+    def __len__(self):
+        return len(self.names)
+
+    def prefix(self, query, limit=10):
+        """Names with a word starting with `query`, full-name matches first."""
+        q = query.strip().lower()
+        if not q:
+            return self.names[:limit]
+        hits, seen = [], set()
+        for pos in range(bisect.bisect_left(self._prefixes, (q,)), len(self._prefixes)):
+            text, i = self._prefixes[pos]
+            if not text.startswith(q):
+                break
+            if i not in seen:
+                seen.add(i)
+                hits.append(i)
+        hits.sort(key=lambda i: (not self.names[i].lower().startswith(q), self.names[i].lower()))
+        return [self.names[i] for i in hits[:limit]]
+
+    def fuzzy(self, query, limit=10, min_score=0.3):
+        """Trigram similarity (Dice coefficient) over candidates sharing a trigram."""
+        grams = _trigrams(query.strip())
+        shared = {}
+        for gram in grams:
+            for i in self._by_gram.get(gram, ()):
+                shared[i] = shared.get(i, 0) + 1
+        scored = [
+            (2 * count / (len(grams) + len(self._grams[i])), i)
+            for i, count in shared.items()
+        ]
+        scored = [s for s in scored if s[0] >= min_score]
+        scored.sort(key=lambda s: (-s[0], self.names[s[1]].lower()))
+        return [self.names[i] for _, i in scored[:limit]]
+
+    def search(self, query, limit=10):
+        """Prefix hits first, topped up with fuzzy matches."""
+        results = self.prefix(query, limit)
+        if len(results) < limit and query.strip():
+            for name in self.fuzzy(query, limit):
+                if name not in results:
+                    results.append(name)
+                if len(results) >= limit:
+                    break
+        return results
+
+
+# =========================
+# Per-team catalogs (cached per custom-file + library version)
+# =========================
+
+_indexes = {}  # {team_key: ((custom version, library version), ExerciseIndex)}
+_lock = threading.Lock()
+
+
+def get_catalog_index(team=None):
+    """Index over the built-in library plus `team`'s custom exercises."""
+    team_key = (team or "").strip().lower()
+    library = get_catalog()
+    version = (get_custom_exercises_version(), library.version)
+    cached = _indexes.get(team_key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    with _lock:
+        entries = {
+            entry["name"]: {"muscle_group": entry["muscle_group"], "default_weight": entry["default_weight"]}
+            for entry in library.entries
+        }
+        if team_key:
+            entries.update(load_custom_exercises().get(team_key, {}))
+        index = ExerciseIndex(entries)
+        _indexes[team_key] = (version, index)
+    return index
+
+
+def search_exercises(query, team=None, limit=10):
+    return get_catalog_index(team).search(query, limit)
@@ -0,0 +1,84 @@
+"""
+Local multi-process stand-in for a partitioned deployment.
+
+    python cluster.py [--nodes 3] [--root cluster_data] [--base-port 8600] [--app]
+
+Starts one api_server.py process per partition, each in its own data root
+(ROOT/node<i>, so it only ever sees its own user_data/), plus router.py
+in front of them on BASE_PORT. With --app, each node also runs the
+Streamlit app on BASE_PORT + 100 + i, configured with WORKOUT_NODES so its
+leaderboard gathers across partitions. Raising --nodes changes which node
+owns each key, so it is only safe on a fresh ROOT: there is no tool that
+re-homes existing data.
+
+Ctrl-C stops everything.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def start_cluster(n_nodes, root, base_port, with_app=False, host="127.0.0.1"):
+    """Launch the node processes and the router. Returns (processes, router URL)."""
+    api_urls = [f"http://{host}:{base_port + 1 + i}" for i in range(n_nodes)]
+    app_urls = [f"http://{host}:{base_port + 100 + i}" for i in range(n_nodes)] if with_app else []
+    env = dict(os.environ, WORKOUT_NODES=",".join(api_urls), WORKOUT_APP_NODES=",".join(app_urls))
+
+    processes = []
+    for i in range(n_nodes):
+        node_root = os.path.join(root, f"node{i}")
+        os.makedirs(node_root, exist_ok=True)
+        processes.append(subprocess.Popen(
+            [sys.executable, os.path.join(HERE, "api_server.py"),
+             "--host", host, "--port", str(base_port + 1 + i)],
+            cwd=node_root, env=dict(env, WORKOUT_NODE_INDEX=str(i)),
+        ))
+        if with_app:
+            processes.append(subprocess.Popen(
+                [sys.executable, "-m", "streamlit", "run", os.path.join(HERE, "app.py"),
+                 "--server.port", str(base_port + 100 + i), "--server.headless", "true"],
+                cwd=node_root, env=dict(env, WORKOUT_NODE_INDEX=str(i)),
+            ))
+    processes.append(subprocess.Popen(
+        [sys.executable, os.path.join(HERE, "router.py"), "--host", host, "--port", str(base_port)],
+        cwd=root, env=env,
+    ))
+    return processes, f"http://{host}:{base_port}"
+
+
+def stop_cluster(processes):
+    for proc in processes:
+        proc.terminate()
+    for proc in processes:
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run N partitions + a router locally.")
+    parser.add_argument("--nodes", type=int, default=3)
+    parser.add_argument("--root", default="cluster_data")
+    parser.add_argument("--base-port", type=int, default=8600)
+    parser.add_argument("--app", action="store_true", help="also run a Streamlit app per node")
+    args = parser.parse_args(argv)
+
+    processes, router_url = start_cluster(args.nodes, os.path.abspath(args.root), args.base_port, args.app)
+    print(f"{args.nodes} partitions under {args.root}/, router on {router_url}")
+    try:
+        while all(proc.poll() is None for proc in processes):
+            time.sleep(0.5)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop_cluster(processes)
+
+
+if __name__ == "__main__":
+    main()
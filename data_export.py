@@ -0,0 +1,270 @@
+"""
+Bulk export / import of all stored workout data.
+
+    python data_export.py export OUT_DIR [--format csv|parquet] [--rows-per-part N]
+    python data_export.py import IN_DIR
+
+Every dataset is streamed through generators one user (or schedule) at a
+time and written into rolling partitions, so memory stays flat no matter
+how many users exist. Import goes back through the helpers save functions,
+so it lands in whatever storage backend helpers is configured with.
+"""
+
+import argparse
+import csv
+import os
+import sys
+from itertools import groupby
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from helpers import (
+    get_all_users,
+    get_all_schedule_keys,
+    load_user_data,
+    save_user_data,
+    rebuild_activity_index,
+    rebuild_completion_mask,
+    set_user_team,
+    load_user_schedule,
+    save_user_schedule,
+)
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet is optional; CSV always works
+    pa = None
+    pq = None
+
+
+# =========================
+# Datasets (column layout)
+# =========================
+
+DATASETS = {
+    "meta":           ["user", "team", "cycle", "cycle_started"],
+    "progress":       ["user", "workout", "completed_at"],
+    "weights":        ["user", "exercise", "weight"],
+    "weight_history": ["user", "exercise", "date", "weight"],
+    "setprogress":    ["user", "day_key", "exercise", "set_index", "done"],
+    "schedules":      ["schedule_key", "week", "day", "group", "text"],
+}
+
+ROWS_PER_PART = 100_000
+PARQUET_BATCH_ROWS = 10_000
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_bool(value):
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("true", "1", "yes")
+
+
+# =========================
+# Row generators (export side)
+# =========================
+
+def iter_rows(dataset):
+    """Yield rows (tuples in DATASETS order) for one dataset, user by user."""
+    if dataset == "schedules":
+        for key in get_all_schedule_keys():
+            for week, days in load_user_schedule(key).items():
+                if not isinstance(days, dict):
+                    continue
+                for day, plan in days.items():
+                    for group, text in (plan or {}).items():
+                        yield (key, int(week), int(day), group, text)
+        return
+
+    for user in get_all_users():
+        data = load_user_data(user, dataset)
+        if dataset == "meta":
+            if data:
+                yield (user, data.get("team"), data.get("cycle"), data.get("cycle_started"))
+        elif dataset == "progress":
+            for workout, completed_at in data.items():
+                yield (user, workout, completed_at)
+        elif dataset == "weights":
+            for exercise, weight in data.items():
+                weight = _to_float(weight)
+                if weight is not None:
+                    yield (user, exercise, weight)
+        elif dataset == "weight_history":
+            for exercise, entries in data.items():
+                for entry in entries:
+                    weight = _to_float(entry.get("weight"))
+                    if weight is not None:
+                        yield (user, exercise, entry.get("date"), weight)
+        elif dataset == "setprogress":
+            for day_key, exercises in data.items():
+                for exercise, sets in exercises.items():
+                    for i, done in enumerate(sets):
+                        yield (user, day_key, exercise, i, bool(done))
+
+
+# =========================
+# Partition writers / readers
+# =========================
+
+def _chunks(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _write_csv_part(path, columns, rows):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        writer.writerows(rows)
+
+
+def _write_parquet_part(path, columns, rows):
+    writer = None
+    try:
+        for batch in _chunks(rows, PARQUET_BATCH_ROWS):
+            table = pa.table({col: [r[i] for r in batch] for i, col in enumerate(columns)})
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def export_all(out_dir, fmt="csv", rows_per_part=ROWS_PER_PART):
+    """Write every dataset to out_dir/<dataset>/part-NNNNN.<fmt>. Returns row counts."""
+    if fmt == "parquet" and pq is None:
+        raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow).")
+    writer = _write_parquet_part if fmt == "parquet" else _write_csv_part
+
+    counts = {}
+    for dataset, columns in DATASETS.items():
+        part_dir = os.path.join(out_dir, dataset)
+        os.makedirs(part_dir, exist_ok=True)
+        counts[dataset] = 0
+        # Each partition gets a bounded slice of the row stream
+        for part_num, part_rows in enumerate(_chunks(iter_rows(dataset), rows_per_part)):
+            path = os.path.join(part_dir, f"part-{part_num:05d}.{fmt}")
+            writer(path, columns, part_rows)
+            counts[dataset] += len(part_rows)
+    return counts
+
+
+def iter_dataset(in_dir, dataset):
+    """Stream rows back (as dicts) from every partition of a dataset, in part order."""
+    part_dir = os.path.join(in_dir, dataset)
+    if not os.path.isdir(part_dir):
+        return
+    for fname in sorted(os.listdir(part_dir)):
+        path = os.path.join(part_dir, fname)
+        if fname.endswith(".csv"):
+            with open(path, newline="") as f:
+                yield from csv.DictReader(f)
+        elif fname.endswith(".parquet"):
+            if pq is None:
+                raise RuntimeError("Parquet import needs pyarrow (pip install pyarrow).")
+            for batch in pq.ParquetFile(path).iter_batches(batch_size=PARQUET_BATCH_ROWS):
+                yield from batch.to_pylist()
+
+
+# =========================
+# Import (one owner at a time)
+# =========================
+
+def _merge_rows(dataset, current, rows):
+    """Fold one owner's rows into its existing stored data."""
+    if dataset == "meta":
+        for r in rows:  # the team is assigned separately, through set_user_team
+            for field in ("cycle", "cycle_started"):
+                if r.get(field) not in (None, ""):
+                    current[field] = int(r[field]) if field == "cycle" else r[field]
+    elif dataset == "progress":
+        for r in rows:
+            current[r["workout"]] = r["completed_at"]
+    elif dataset == "weights":
+        for r in rows:
+            weight = _to_float(r["weight"])
+            if weight is not None:
+                current[r["exercise"]] = weight
+    elif dataset == "weight_history":
+        for r in rows:
+            entry = {"date": r["date"], "weight": _to_float(r["weight"])}
+            entries = current.setdefault(r["exercise"], [])
+            if entry not in entries:
+                entries.append(entry)
+    elif dataset == "setprogress":
+        for r in rows:
+            sets = current.setdefault(r["day_key"], {}).setdefault(r["exercise"], [False, False, False])
+            i = int(r["set_index"])
+            sets.extend([False] * (i + 1 - len(sets)))
+            sets[i] = _to_bool(r["done"])
+    elif dataset == "schedules":
+        for r in rows:
+            week = current.setdefault(str(int(r["week"])), {})
+            week.setdefault(str(int(r["day"])), {})[r["group"]] = r["text"]
+    return current
+
+
+def import_all(in_dir):
+    """Load an exported dataset into the configured store. Returns row counts."""
+    counts = {}
+    for dataset in DATASETS:
+        owner_col = "schedule_key" if dataset == "schedules" else "user"
+        counts[dataset] = 0
+        # Export writes each owner's rows contiguously, so groupby keeps one owner in memory
+        for owner, group in groupby(iter_dataset(in_dir, dataset), key=lambda r: r[owner_col]):
+            rows = list(group)
+            counts[dataset] += len(rows)
+            if dataset == "schedules":
+                save_user_schedule(owner, _merge_rows(dataset, load_user_schedule(owner), rows))
+            else:
+                save_user_data(owner, dataset, _merge_rows(dataset, load_user_data(owner, dataset), rows))
+                if dataset == "meta":
+                    # Keeps the team index and live team counters in step with meta
+                    team = next((r["team"] for r in reversed(rows) if r.get("team") not in (None, "")), None)
+                    if team:
+                        set_user_team(owner, team)
+                elif dataset == "progress":
+                    rebuild_completion_mask(owner)
+                    rebuild_activity_index(owner)
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk export/import of workout data.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    exp = sub.add_parser("export", help="stream all data into columnar partitions")
+    exp.add_argument("out_dir")
+    exp.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    exp.add_argument("--rows-per-part", type=int, default=ROWS_PER_PART)
+
+    imp = sub.add_parser("import", help="load an exported dataset into the store")
+    imp.add_argument("in_dir")
+
+    args = parser.parse_args(argv)
+    if args.command == "export":
+        counts = export_all(args.out_dir, args.format, args.rows_per_part)
+    else:
+        counts = import_all(args.in_dir)
+
+    for dataset, n in counts.items():
+        print(f"{dataset:15s} {n} rows")
+
+
+if __name__ == "__main__":
+    main()
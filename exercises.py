@@ -1,158 +1,260 @@
-delts = [
-    ("Lateral Raise", 20),
-    ("Arnold Press", 30),
-    ("Military Press", 30),
-    ("Rear Delt Row", 25),
-    ("Face Pull", 20),
-    ("Hip Huggers", 25),
-    ("Front Raise", 20),
-    ("Shoulder Press", 45),
-]
-
-chest = [
-    ("Pushups", 0),
-    ("Floor Fly", 25,),
-    ("Pullovers", 35),
-    ("Cross Overs", 20),
-    ("Bench Press", 100),
-    ("Incline Bench Press", 70),
-    ("Center Press", 40)
-]
-
-biceps = [
-    ("Zottman Curls", 20),
-    ("Preacher Curls", 40),
-    ("Drag Curls", 40),
-    ("Waiter Curls", 30),
-    ("Incline Curls", 20),
-    ("DB Curls", 20),
-    ("Reverse Curls", 15),
-    ("Hammer Curls", 20)
-]
-
-butt = [
-    ("Goblet Squat", 45),
-    ("Sumo Squat", 50),
-    ("Step-ups", 25),
-    ("Deadlift", 115),
-    ("Squat", 115)
-]
-
-back_lats = [
-    ("Single Arm Row", 25),
-    ("Dumbell Pullover", 35),
-    ("Seal Row", 30),
-    ("Incline Row", 25),
-    ("Lat Pull Down", 20),
-    ("Shrugs", 125)
-]
-
-back_mids = [
-    ("Around the World", 20),
-    ("Scap Squeeze", 100),
-    ("Landmind Row", 70),
-    ("Supinated Row", 80)
-]
-
-back_lower = [
-    ("Good Mornings", 100),
-    ("Rack Pull", 125),
-    ("Stiff Leg Deadlift", 115),
-    ("Back Extension", 25)
-]
-
-back_combo = [
-    ("DB Lift March", 30), 
-    ("Gorilla Row", 25),
-    ("Renegade Row", 10),
-    ("Dead Row", 80),
-    ("Inverted Row (like a pullup)", 0),
-    ("Farmer's Walk", 40)
-]
-
-abs_upper = [
-    ("Around the world", 25),
-    ("Side Bend", 35),
-    ("Standing Twist", 10),
-    ("Figure 8's", 15),
-    ("Standing Crunch", 20),
-    ("Hip Dip", 0),
-    ("Spider Plank", 15)
-]
-
-abs_lower = [
-    ("Side-to-Side", "ankle weights"),
-    ("Up-and-Over", "ankle weights"),
-    ("Cross Taps", 10),
-    ("Reverse Crunches", 0),
-    ("Butterflies", 0),
-    ("Side Crunches", 0),
-    ("Heel Touches", 0)
-
-]
-
-abs_combo = [
-    ("Side Carry", 40),
-    ("Bridge March", 35),
-    ("Spider Pulls", 15)
-]
-
-triceps = [
-    ("Pull Downs", "cables"),
-    ("Reverse Grip Pull Downs", "cables"),
-    ("Kickback", 25),
-    ("Lying Tricep Extension - Pulse", 10),
-    ("Lying Tricep Extension - In and Out", 10),
-    ("Skull Crushers", 40),
-    ("Narrow Grip Bench Press", 60)
-]
-
-calf = [
-    ("Standing", 30),
-    ("Seated", 30),
-    ("Bent Knee", 30),
-    ("Wide", 30),
-    ("Inner (toes pointed in)", 30),
-    ("Single", 30),
-    ("Box Raise", 30)
-]
-
-thighs = [
-    ("Clam Shells", "band"),
-    ("Leg Extensions", "ankle weights"),
-    ("Side Lunge", 15),
-    ("Fire Hydrant/Donkey Kick", "band"),
-    ("Curtsey Lunge", 10),
-    ("Scissor Kick", "ankle weights"),
-    ("Bridges", 100)
-]
-
-all_groups = {
-    "Delts": delts,
-    "Chest": chest,
-    "Biceps": biceps,
-    "Butt": butt,
-    "Back Lats": back_lats,
-    "Back Mids": back_mids,
-    "Back Lower": back_lower,
-    "Back Combo": back_combo,
-    "Abs Upper": abs_upper,
-    "Abs Lower": abs_lower,
-    "Abs Combo": abs_combo,
-    "Triceps": triceps,
-    "Calves": calf,
-    "Thighs": thighs,
-}
+"""
+Built-in exercise library.
 
-# exercises.py
+The library is data, not code: exercises.json next to this module (or the
+.json / .csv file named by WORKOUT_EXERCISE_CATALOG) holds one record per
+exercise with typed fields:
 
-def get_exercise_catalog():
-    catalog = []
-    for group, exercises in all_groups.items():
-        for name, default_weight in exercises:
-            catalog.append({
-                "name": name,
-                "muscle_group": group,
-                "default_weight": default_weight
-            })
+    name          display name, unique
+    muscle_group  the group it is listed under
+    load          default working weight in lbs (0 = bodyweight), or null
+    equipment     equipment tag ("band", "cables", ...) when there is no load
+    slots         generator pools it can be drawn for (see generate_base_day)
+
+A CSV file has the same columns, with slots separated by ";".
+
+get_catalog() validates and compiles the file once per content hash and
+pickles the result to user_data/.catalog/<hash>.pickle, so later processes
+skip parsing and validation and just unpickle. The file is stat-ed at
+most every CATALOG_CHECK_INTERVAL seconds, and new content is swapped in
+without a restart. An edit that fails validation keeps the previous
+catalog and is reported as the "catalog" status (see utils/perf.py).
+
+The old module-level lists (delts, chest, ..., all_groups) still resolve,
+always from the current catalog.
+"""
+
+import csv
+import hashlib
+import json
+import os
+import pickle
+import threading
+import time
+
+from utils.perf import set_status
+
+CATALOG_FILE = os.environ.get(
+    "WORKOUT_EXERCISE_CATALOG",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "exercises.json"),
+)
+CATALOG_CACHE_DIR = os.path.join("user_data", ".catalog")
+CATALOG_CHECK_INTERVAL = float(os.environ.get("WORKOUT_CATALOG_CHECK_INTERVAL", "2.0"))
+CATALOG_FORMAT = 1  # bump when the compiled layout changes
+
+
+class Catalog:
+    """A compiled library. Treat every attribute as read-only."""
+
+    __slots__ = ("version", "entries", "pools", "weights", "groups")
+
+    def __init__(self, version, entries, pools, groups, weights):
+        self.version = version    # content hash of the source file
+        self.entries = entries    # [{"name", "muscle_group", "load", "equipment", "slots", "default_weight"}]
+        self.pools = pools        # {pool: [(name, default_weight), ...]}, file order
+        self.groups = groups      # {muscle_group: [(name, default_weight), ...]}, file order
+        self.weights = weights    # {name: default_weight}
+
+
+# =========================
+# Parsing + validation
+# =========================
+
+def _read_records(path, raw):
+    if path.lower().endswith(".csv"):
+        rows = list(csv.DictReader(raw.decode("utf-8").splitlines()))
+        for row in rows:
+            row["slots"] = [s.strip() for s in (row.get("slots") or "").split(";") if s.strip()]
+            for field in ("load", "equipment"):
+                if not (row.get(field) or "").strip():
+                    row[field] = None
+        return rows
+    data = json.loads(raw)
+    return data["exercises"] if isinstance(data, dict) else data
+
+
+def _typed(record, line):
+    name = str(record.get("name") or "").strip()
+    group = str(record.get("muscle_group") or "").strip()
+    if not name or not group:
+        raise ValueError(f"exercise {line}: 'name' and 'muscle_group' are required")
+
+    load, equipment = record.get("load"), record.get("equipment")
+    if load is not None:
+        try:
+            load = float(load)
+        except (TypeError, ValueError):
+            raise ValueError(f"{name}: 'load' must be a number, got {load!r}")
+        if load < 0:
+            raise ValueError(f"{name}: 'load' must not be negative")
+        load = int(load) if load.is_integer() else load
+    if equipment is not None:
+        equipment = str(equipment).strip() or None
+    if (load is None) == (equipment is None):
+        raise ValueError(f"{name}: give exactly one of 'load' or 'equipment'")
+
+    slots = record.get("slots") or [group]
+    if isinstance(slots, str) or not all(isinstance(s, str) and s.strip() for s in slots):
+        raise ValueError(f"{name}: 'slots' must be a list of pool names")
+    return {
+        "name": name,
+        "muscle_group": group,
+        "load": load,
+        "equipment": equipment,
+        "slots": [s.strip() for s in slots],
+        # What callers have always seen: a number, or the equipment tag
+        "default_weight": load if load is not None else equipment,
+    }
+
+
+def compile_catalog(path, raw, version):
+    """Validate the source records and build a Catalog. Raises ValueError."""
+    try:
+        records = _read_records(path, raw)
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"{path}: unreadable exercise catalog ({e})")
+    entries, seen = [], set()
+    for line, record in enumerate(records, 1):
+        entry = _typed(record, line)
+        if entry["name"] in seen:
+            raise ValueError(f"{entry['name']}: listed twice")
+        seen.add(entry["name"])
+        entries.append(entry)
+
+    pools, groups, weights = {}, {}, {}
+    for entry in entries:
+        item = (entry["name"], entry["default_weight"])
+        for slot in entry["slots"]:
+            pools.setdefault(slot, []).append(item)
+        groups.setdefault(entry["muscle_group"], []).append(item)
+        weights[entry["name"]] = entry["default_weight"]
+    return Catalog(version, entries, pools, groups, weights)
+
+
+# =========================
+# Compiled cache + hot reload
+# =========================
+
+def _cache_file(version):
+    return os.path.join(CATALOG_CACHE_DIR, f"{version}.pickle")
+
+
+def _load_compiled(version):
+    try:
+        with open(_cache_file(version), "rb") as f:
+            fmt, version_in_file, compiled = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError):
+        return None
+    if fmt != CATALOG_FORMAT or version_in_file != version:
+        return None
+    return Catalog(version, *compiled)
+
+
+def _save_compiled(catalog):
+    path = _cache_file(catalog.version)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(CATALOG_CACHE_DIR, exist_ok=True)
+        with open(tmp, "wb") as f:
+            pickle.dump(
+                (CATALOG_FORMAT, catalog.version,
+                 (catalog.entries, catalog.pools, catalog.groups, catalog.weights)),
+                f, protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        os.replace(tmp, path)
+        for name in os.listdir(CATALOG_CACHE_DIR):
+            if name.endswith(".pickle") and name != os.path.basename(path):
+                os.remove(os.path.join(CATALOG_CACHE_DIR, name))  # superseded versions
+    except OSError:
+        pass  # read-only data dir: compile on every start instead
+
+
+def _load(path):
+    with open(path, "rb") as f:
+        raw = f.read()
+    version = hashlib.sha1(raw).hexdigest()
+    catalog = _load_compiled(version)
+    if catalog is None:
+        catalog = compile_catalog(path, raw, version)
+        _save_compiled(catalog)
     return catalog
+
+
+def _stat_key(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+_catalog = None
+_stat = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def get_catalog():
+    """The current compiled library, reloaded when the source file changes."""
+    global _catalog, _stat, _checked_at
+    now = time.monotonic()
+    if _catalog is not None and now - _checked_at < CATALOG_CHECK_INTERVAL:
+        return _catalog
+
+    with _lock:
+        if _catalog is not None and now - _checked_at < CATALOG_CHECK_INTERVAL:
+            return _catalog
+        stat = _stat_key(CATALOG_FILE)
+        if _catalog is None or stat != _stat:
+            try:
+                catalog = _load(CATALOG_FILE)
+            except (OSError, ValueError) as e:
+                if _catalog is None:
+                    raise
+                set_status("catalog", f"reload failed, keeping {_catalog.version[:8]}: {e}")
+            else:
+                if _catalog is None or catalog.version != _catalog.version:
+                    set_status("catalog", f"{len(catalog.entries)} exercises ({catalog.version[:8]})")
+                _catalog = catalog
+            _stat = stat
+        _checked_at = now
+    return _catalog
+
+
+def get_catalog_version():
+    return get_catalog().version
+
+
+def get_exercise_catalog():
+    """[{"name", "muscle_group", "default_weight", ...}, ...]; shared, don't mutate."""
+    return get_catalog().entries
+
+
+# =========================
+# Legacy module attributes
+# =========================
+
+_GROUP_ATTRS = {
+    "delts": "Delts",
+    "chest": "Chest",
+    "biceps": "Biceps",
+    "butt": "Butt",
+    "back_lats": "Back Lats",
+    "back_mids": "Back Mids",
+    "back_lower": "Back Lower",
+    "back_combo": "Back Combo",
+    "abs_upper": "Abs Upper",
+    "abs_lower": "Abs Lower",
+    "abs_combo": "Abs Combo",
+    "triceps": "Triceps",
+    "calf": "Calves",
+    "thighs": "Thighs",
+}
+
+
+def __getattr__(name):
+    if name == "all_groups":
+        return get_catalog().groups
+    if name in _GROUP_ATTRS:
+        return get_catalog().pools.get(_GROUP_ATTRS[name], [])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,8 +1,21 @@
 import os
-import json
+import time
+import atexit
+import bisect
+import hashlib
 import random
+import threading
+import weakref
+from contextlib import contextmanager
+from functools import lru_cache, wraps
+from urllib.parse import quote, unquote
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+from utils import codec
+from utils.invalidation import FileGenerationNotifier, LocalGenerationNotifier
+from utils.lru import LRUCache
+
 # =========================
 # Paths & Setup
 # =========================
@@ -11,6 +24,363 @@ USER_DIR = "user_data"
 os.makedirs(USER_DIR, exist_ok=True)
 
 SHARED_PLAN_FILE = "shared_plans.json"  # team-shared base plans (exercise names only)
+CUSTOM_EXERCISE_FILE = "custom_exercises.json"  # team-defined catalog additions
+
+
+# =========================
+# Read cache & cross-process invalidation
+# =========================
+# Every JSON read/write goes through _read_json/_write_json. Reads are served
+# from an in-process cache; each save bumps a generation for the file, and a
+# cached entry is re-validated against it at most every CACHE_MAX_STALENESS
+# seconds. With the file notifier, writes from other worker processes are
+# therefore picked up within that bound. Loads that precede a save run under
+# fresh_reads(), which skips that window, so a load → modify → save helper
+# never starts from a copy another worker has already replaced. Within a
+# process those helpers also hold a per-user (or per-schedule / per-file)
+# lock for the whole sequence, so two threads, e.g. concurrent API
+# requests, can't interleave and drop each other's update. Files are
+# written to a temp name and renamed into place, so a concurrent reader
+# sees either the old bytes or the new ones, never a partial file.
+# The cache is an LRU bounded by WORKOUT_READ_CACHE_ENTRIES files, so a
+# long-running process doesn't end up holding the whole data set.
+
+CACHE_MAX_STALENESS = float(os.environ.get("WORKOUT_CACHE_MAX_STALENESS", "1.0"))
+# Entry bounds (see utils/lru.py): raw file bytes, and the per-user derived
+# caches here and in progression.py / analytics.py
+READ_CACHE_MAX_ENTRIES = int(os.environ.get("WORKOUT_READ_CACHE_ENTRIES", "4096"))
+USER_CACHE_MAX_ENTRIES = int(os.environ.get("WORKOUT_USER_CACHE_ENTRIES", "1024"))
+GENERATIONS_DIR = os.path.join(USER_DIR, ".generations")
+
+if os.environ.get("WORKOUT_CACHE_NOTIFIER", "file") == "local":
+    _change_notifier = LocalGenerationNotifier()
+else:
+    _change_notifier = FileGenerationNotifier(GENERATIONS_DIR)
+_read_cache = LRUCache(READ_CACHE_MAX_ENTRIES)  # {path: (generation, checked_at, raw_bytes)}
+
+# On-disk encoding for new writes (see utils/codec.py): "auto", "json", "zlib",
+# "records" or "legacy" (indented JSON). Reads accept every format.
+STORAGE_CODEC = os.environ.get("WORKOUT_STORAGE_CODEC", "auto")
+
+
+def set_change_notifier(notifier):
+    """Swap the notifier (e.g. LocalGenerationNotifier() in tests) and drop the cache."""
+    global _change_notifier
+    _change_notifier = notifier
+    clear_read_cache()
+
+
+def clear_read_cache():
+    _read_cache.clear()
+
+
+_fresh = threading.local()
+
+
+@contextmanager
+def fresh_reads():
+    """
+    Reads inside always re-check the file's generation instead of trusting
+    a cache entry younger than CACHE_MAX_STALENESS. Also usable as a
+    decorator on load → modify → save helpers.
+    """
+    depth = getattr(_fresh, "depth", 0)
+    _fresh.depth = depth + 1
+    try:
+        yield
+    finally:
+        _fresh.depth = depth
+
+
+_update_locks = weakref.WeakValueDictionary()  # {(scope, key): RLock}, dropped once unused
+_update_locks_guard = threading.Lock()
+
+
+def update_lock(scope, key):
+    """
+    The re-entrant lock serializing load → modify → save sequences on one
+    (scope, key) in this process: ("user", name), ("schedule", key) or
+    ("file", path). Re-entrant, so a locked helper can call another one.
+    """
+    with _update_locks_guard:
+        lock = _update_locks.get((scope, key))
+        if lock is None:
+            lock = _update_locks[(scope, key)] = threading.RLock()
+        return lock
+
+
+def _locked_update(scope, key=None):
+    """
+    Decorator for load → modify → save helpers: holds update_lock(scope,
+    first argument) — or the fixed `key` — and reads fresh for the call.
+    """
+    def decorate(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with update_lock(scope, args[0] if key is None else key), fresh_reads():
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def _parse_json(raw):
+    try:
+        return codec.decode(raw)
+    except ValueError:
+        return {}
+
+
+def _read_raw(path):
+    """Stored bytes of a file (b"" when it doesn't exist), through the cache."""
+    pending = _pending_writes.get(path)
+    if pending is not None:
+        return pending[1]
+
+    now = time.monotonic()
+    entry = _read_cache.get(path)
+    if entry is not None:
+        generation, checked_at, raw = entry
+        if now - checked_at < CACHE_MAX_STALENESS and not getattr(_fresh, "depth", 0):
+            return raw
+        if _change_notifier.generation(path) == generation:
+            _read_cache[path] = (generation, now, raw)
+            return raw
+        _read_cache.pop(path, None)
+
+    # Read the generation *before* the file so a concurrent write is never missed
+    generation = _change_notifier.generation(path)
+    raw = b""
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            raw = f.read()
+    _read_cache[path] = (generation, now, raw)
+    return raw
+
+
+def _read_json(path):
+    return _parse_json(_read_raw(path))
+
+
+def _read_json_with_fallback(path, legacy_path):
+    """Read `path`, or the pre-sharding `legacy_path` if `path` was never written."""
+    raw = _read_raw(path)
+    if not raw:
+        raw = _read_raw(legacy_path)
+    return _parse_json(raw)
+
+
+def _write_json(path, data, codec_name=None, signals=()):
+    """`signals`: extra notifier keys to bump once the file is on disk."""
+    raw = codec.encode(data, codec_name or STORAGE_CODEC)
+    if WRITE_BEHIND_INTERVAL > 0:
+        _enqueue_write(path, raw, signals)
+    else:
+        _commit_write(path, raw, signals)
+
+
+def _commit_write(path, raw, signals=()):
+    parent = os.path.dirname(path)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+    # Write aside and rename: readers in other processes never see a truncated file
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(raw)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    generation = _change_notifier.bump(path)
+    _read_cache[path] = (generation, time.monotonic(), raw)
+    for key in signals:
+        _change_notifier.bump(key)
+
+
+def notify_file_replaced(path):
+    """Tell every process's cache that `path` changed outside _write_json."""
+    _read_cache.pop(path, None)
+    _change_notifier.bump(path)
+
+
+def _file_version(path):
+    """Generation of a file, moved on by writes still queued in this process."""
+    generation = _change_notifier.generation(path)
+    if WRITE_BEHIND_INTERVAL > 0:
+        return (generation, _write_seq.get(path, 0))
+    return generation
+
+
+# =========================
+# Write-behind queue (optional)
+# =========================
+# With WORKOUT_WRITE_BEHIND_INTERVAL > 0 (seconds), _write_json only encodes
+# the snapshot and queues it. Repeated saves of the same file coalesce, last
+# write wins; since every file is rewritten whole, a burst of appends to a
+# log (weight history, activity index) also collapses into one write. A
+# background thread commits the queue every interval as one group, and
+# flush_writes() runs at interpreter exit. Processes that end without a
+# normal interpreter exit — ProcessPoolExecutor / multiprocessing workers
+# leave through os._exit, so atexit never runs — must call flush_writes()
+# themselves before returning their result. Reads in this process see queued
+# snapshots immediately; other processes see them after the next commit.
+# A write that fails (disk full, permissions) stays queued and is retried
+# next round; the last error per path is kept in failed_writes().
+
+WRITE_BEHIND_INTERVAL = float(os.environ.get("WORKOUT_WRITE_BEHIND_INTERVAL", "0"))
+
+_pending_writes = {}  # {path: (seq, raw_bytes, signals)}
+_write_seq = {}       # {path: seq of the latest queued write}
+_write_lock = threading.Lock()
+_flush_lock = threading.Lock()
+_writer_wakeup = threading.Event()
+_writer_thread = None
+_write_errors = {}    # {path: repr of the last failed commit}
+
+
+def _enqueue_write(path, raw, signals=()):
+    global _writer_thread
+    with _write_lock:
+        seq = _write_seq.get(path, 0) + 1
+        _write_seq[path] = seq
+        # Coalesced writes keep every signal they carried
+        previous = _pending_writes.get(path)
+        signals = frozenset(signals) | (previous[2] if previous else frozenset())
+        _pending_writes[path] = (seq, raw, signals)
+        if _writer_thread is None:
+            _writer_thread = threading.Thread(
+                target=_writer_loop, name="workout-write-behind", daemon=True
+            )
+            _writer_thread.start()
+
+
+def _writer_loop():
+    while True:
+        _writer_wakeup.wait(WRITE_BEHIND_INTERVAL)
+        _writer_wakeup.clear()
+        try:
+            flush_writes()
+        except Exception:
+            pass  # per-file errors are already recorded; never let the writer die
+
+
+def flush_writes():
+    """
+    Commit every queued write now. Returns the number of files written; a
+    file that fails stays queued (see failed_writes()) and the rest still go.
+    """
+    written = 0
+    with _flush_lock:
+        with _write_lock:
+            batch = list(_pending_writes.items())
+        for path, (seq, raw, signals) in batch:
+            try:
+                _commit_write(path, raw, signals)
+            except Exception as e:
+                _write_errors[path] = repr(e)
+                continue
+            _write_errors.pop(path, None)
+            written += 1
+            with _write_lock:
+                # A newer snapshot queued meanwhile stays pending for the next round
+                if _pending_writes.get(path, (None,))[0] == seq:
+                    del _pending_writes[path]
+        return written
+
+
+def pending_write_count():
+    return len(_pending_writes)
+
+
+def failed_writes():
+    """{path: last error} for queued writes whose latest commit attempt failed."""
+    return dict(_write_errors)
+
+
+def _list_dir(dirname):
+    """Entries in `dirname`, including ones that so far only exist as queued writes."""
+    names = set(os.listdir(dirname)) if os.path.isdir(dirname) else set()
+    prefix = os.path.join(dirname, "")
+    for path in list(_pending_writes):
+        if path.startswith(prefix):
+            names.add(path[len(prefix):].split(os.sep, 1)[0])
+    return names
+
+
+def _reset_writer_after_fork():
+    global _writer_thread, _write_lock, _flush_lock
+    _writer_thread = None
+    _write_lock, _flush_lock = threading.Lock(), threading.Lock()
+    # The parent still owns (and will commit) its queue; a child committing
+    # those snapshots later could overwrite newer data
+    _pending_writes.clear()
+    _write_seq.clear()
+    _write_errors.clear()
+
+
+atexit.register(flush_writes)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_writer_after_fork)
+
+
+# =========================
+# Sharded layout
+# =========================
+# Every user (and every schedule key) owns one directory with fixed file
+# names, two hash levels down so no directory grows past a few hundred
+# entries:  user_data/ab/cd/<user>/weights.json, where "abcd" are the first
+# hex digits of the name's SHA-1. Enumeration walks the shard tree and reads
+# names off the directories. Files from the old flat layout
+# (user_data/<user>_<type>.json) are still read until migrate_storage.py
+# has moved them.
+
+USER_FILE_TYPES = (
+    "meta", "weights", "weight_history", "progress", "setprogress",
+    "activity", "completion", "cycles", "schedule_overlay",
+)
+
+
+@lru_cache(maxsize=65536)
+def _shard_dir(root, key):
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+    name = quote(key, safe="")
+    if name.startswith("."):  # never ".", ".." or a hidden directory
+        name = "%2E" + name[1:]
+    return os.path.join(root, digest[:2], digest[2:4], name)
+
+
+def _is_shard(name):
+    return len(name) == 2 and all(c in "0123456789abcdef" for c in name)
+
+
+def _sharded_keys(root):
+    """Every key with a directory under `root` (or a write queued for one)."""
+    keys = set()
+    for level1 in _list_dir(root):
+        if not _is_shard(level1):
+            continue
+        for level2 in _list_dir(os.path.join(root, level1)):
+            if _is_shard(level2):
+                keys.update(unquote(n) for n in _list_dir(os.path.join(root, level1, level2)))
+    return keys
+
+
+def legacy_user_file(user, file_type):
+    """Where the flat layout kept a user's file."""
+    return os.path.join(USER_DIR, f"{user}_{file_type}.json")
+
+
+def parse_legacy_user_file(fname):
+    """(user, file_type) for a flat-layout file name, or None."""
+    if not fname.endswith(".json"):
+        return None
+    base = fname[:-5]
+    for file_type in sorted(USER_FILE_TYPES, key=len, reverse=True):
+        suffix = f"_{file_type}"
+        if base.endswith(suffix) and len(base) > len(suffix):
+            return base[:-len(suffix)], file_type
+    return None
 
 
 # =========================
@@ -20,30 +390,49 @@ SHARED_PLAN_FILE = "shared_plans.json"  # team-shared base plans (exercise names
 def get_user_file(user, file_type):
     """
     Build path for a user's JSON file.
-    Example: user='katy', file_type='weights' -> user_data/katy_weights.json
+    Example: user='katy', file_type='weights' -> user_data/12/26/katy/weights.json
     """
-    filename = f"{user}_{file_type}.json"
-    return os.path.join(USER_DIR, filename)
+    return os.path.join(_shard_dir(USER_DIR, user), f"{file_type}.json")
 
 
 def load_user_data(user, file_type):
-    path = get_user_file(user, file_type)
-    if os.path.exists(path):
-        try:
-            with open(path, "r") as f:
-                data = f.read().strip()
-                if not data:
-                    return {}
-                return json.loads(data)
-        except json.JSONDecodeError:
-            return {}
-    return {}
+    return _read_json_with_fallback(get_user_file(user, file_type), legacy_user_file(user, file_type))
 
 
-def save_user_data(user, file_type, data):
-    path = get_user_file(user, file_type)
-    with open(path, "w") as f:
-        json.dump(data, f, indent=4)
+def save_user_data(user, file_type, data, signals=()):
+    if file_type in ACTIVITY_FILE_TYPES:
+        signals = tuple(signals) + _activity_signals(user)
+    _write_json(get_user_file(user, file_type), data, signals=signals)
+
+
+def get_data_version(user, file_type):
+    """Generation of a user's file; changes whenever it's saved (from any process)."""
+    return _file_version(get_user_file(user, file_type))
+
+
+LOAD_MANY_WORKERS = 8
+
+
+def load_many(users, file_types, max_workers=LOAD_MANY_WORKERS):
+    """
+    Load several file types for many users concurrently on a bounded pool.
+    Returns one {file_type: data} dict per user, in the same order as `users`.
+    """
+    users = list(users)
+    file_types = list(file_types)
+    if not users or not file_types:
+        return [{} for _ in users]
+
+    jobs = [(user, file_type) for user in users for file_type in file_types]
+    workers = max(1, min(max_workers, len(jobs)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        loaded = list(pool.map(lambda job: load_user_data(*job), jobs))
+
+    results = []
+    for i in range(len(users)):
+        row = loaded[i * len(file_types):(i + 1) * len(file_types)]
+        results.append(dict(zip(file_types, row)))
+    return results
 
 
 # =========================
@@ -63,51 +452,172 @@ def get_user_team(user):
     return meta.get("team")
 
 
+@_locked_update("user")
 def set_user_team(user, team_name):
     meta = get_user_meta(user)
+    old_team = meta.get("team")
     if team_name:
         meta["team"] = team_name
     else:
         meta.pop("team", None)
-    save_user_meta(user, meta)
+    # Both rosters changed: live team views re-read their member lists
+    signals = tuple(_team_activity_key(t) for t in (old_team, team_name) if t)
+    save_user_data(user, "meta", meta, signals=signals)
+    _move_in_team_index(user, old_team, team_name)
 
 
 def get_all_users():
-    """Infer all user IDs from filenames in user_data."""
-    users = set()
-    if not os.path.exists(USER_DIR):
-        return []
-    for fname in os.listdir(USER_DIR):
-        if not fname.endswith(".json"):
-            continue
-        base = fname[:-5]  # drop .json
-        if "_" in base:
-            user = base.rsplit("_", 1)[0]
-            if user:
-                users.add(user)
+    """Every user with a directory in user_data (plus any not yet migrated)."""
+    users = _sharded_keys(USER_DIR)
+    for fname in _list_dir(USER_DIR):
+        parsed = parse_legacy_user_file(fname)
+        if parsed:
+            users.add(parsed[0])
     return sorted(users)
 
 
+# =========================
+# Team index
+# =========================
+# {team_key: {"name": display name, "members": frozenset of users}} built
+# from every user's meta "team", plus saved team schedules nobody has
+# recorded in their meta yet. Team changes made in this process are applied
+# in place; once the index is older than TEAM_INDEX_MAX_AGE seconds it is
+# rebuilt from disk in the background (picking up other processes'
+# changes) while readers keep using the current snapshot.
+
+TEAM_INDEX_MAX_AGE = float(os.environ.get("WORKOUT_TEAM_INDEX_MAX_AGE", "30"))
+TEAM_SEARCH_LIMIT = 20
+
+_team_index = None
+_team_index_built_at = 0.0
+_team_index_version = 0
+_team_index_rebuilding = False
+_team_index_lock = threading.Lock()
+_team_search = (None, [], [])  # (version, sorted [(word suffix, team_key)], keys by size)
+
+
+def _build_team_index():
+    users = get_all_users()
+    members, names = {}, {}
+    for user, files in zip(users, load_many(users, ["meta"])):
+        team = (files["meta"].get("team") or "").strip()
+        if team:
+            members.setdefault(team.lower(), set()).add(user)
+            names.setdefault(team.lower(), team)
+    # Teams created before membership was recorded only exist as schedule keys
+    user_keys = {user.strip().lower() for user in users}
+    for key in get_all_schedule_keys():
+        if key not in user_keys and key not in names:
+            members[key], names[key] = set(), key.title()
+    return {key: {"name": names[key], "members": frozenset(m)} for key, m in members.items()}
+
+
+def _publish_team_index(index, built_at=None):
+    global _team_index, _team_index_built_at, _team_index_version
+    _team_index = index
+    _team_index_version += 1
+    if built_at is not None:
+        _team_index_built_at = built_at
+
+
+def _rebuild_team_index():
+    global _team_index_rebuilding
+    try:
+        built_at = time.monotonic()
+        index = _build_team_index()
+        with _team_index_lock:
+            _publish_team_index(index, built_at)
+    finally:
+        _team_index_rebuilding = False
+
+
+def get_team_index():
+    """Snapshot of the team index; treat it as read-only."""
+    global _team_index_rebuilding
+    if _team_index is None:
+        with _team_index_lock:
+            if _team_index is None:
+                _publish_team_index(_build_team_index(), time.monotonic())
+    elif time.monotonic() - _team_index_built_at >= TEAM_INDEX_MAX_AGE:
+        with _team_index_lock:
+            start = not _team_index_rebuilding
+            _team_index_rebuilding = True
+        if start:
+            threading.Thread(target=_rebuild_team_index, name="team-index", daemon=True).start()
+    return _team_index
+
+
+def get_team_index_version():
+    """Changes whenever the team index snapshot is replaced."""
+    get_team_index()
+    return _team_index_version
+
+
+def _move_in_team_index(user, old_team, new_team):
+    with _team_index_lock:
+        if _team_index is None:
+            return
+        index = dict(_team_index)  # copy-on-write: readers keep a consistent snapshot
+        old_key = (old_team or "").strip().lower()
+        if old_key in index:
+            members = index[old_key]["members"] - {user}
+            if members:
+                index[old_key] = {"name": index[old_key]["name"], "members": members}
+            else:
+                del index[old_key]
+        new_key = (new_team or "").strip().lower()
+        if new_key:
+            entry = index.get(new_key, {"name": new_team.strip(), "members": frozenset()})
+            index[new_key] = {"name": entry["name"], "members": entry["members"] | {user}}
+        _publish_team_index(index)
+
+
+def search_teams(query, limit=TEAM_SEARCH_LIMIT):
+    """
+    Display names of teams with a word starting with `query`, whole-name
+    matches first; an empty query lists the largest teams.
+    """
+    global _team_search
+    index = get_team_index()
+    version = _team_index_version
+    if _team_search[0] != version:
+        prefixes = []
+        for key in index:
+            words = key.split()
+            prefixes.extend((" ".join(words[w:]), key) for w in range(len(words)))
+        prefixes.sort()
+        largest = sorted(index, key=lambda key: (-len(index[key]["members"]), key))
+        _team_search = (version, prefixes, largest)
+    _, prefixes, largest = _team_search
+
+    q = (query or "").strip().lower()
+    if not q:
+        return [index[key]["name"] for key in largest[:limit] if key in index]
+
+    hits, seen = [], set()
+    # Walk by index from the bisect point: slicing would copy the whole tail
+    for i in range(bisect.bisect_left(prefixes, (q,)), len(prefixes)):
+        text, key = prefixes[i]
+        if not text.startswith(q):
+            break
+        if key not in seen and key in index:
+            seen.add(key)
+            hits.append(key)
+    hits.sort(key=lambda key: (not key.startswith(q), key))
+    return [index[key]["name"] for key in hits[:limit]]
+
+
 # =========================
 # Shared Team Plans (base exercises only)
 # =========================
 
 def load_shared_plans():
-    if os.path.exists(SHARED_PLAN_FILE):
-        try:
-            with open(SHARED_PLAN_FILE, "r") as f:
-                data = f.read().strip()
-                if not data:
-                    return {}
-                return json.loads(data)
-        except json.JSONDecodeError:
-            return {}
-    return {}
+    return _read_json(SHARED_PLAN_FILE)
 
 
 def save_shared_plans(data):
-    with open(SHARED_PLAN_FILE, "w") as f:
-        json.dump(data, f, indent=4)
+    _write_json(SHARED_PLAN_FILE, data)
 
 
 def _shared_key(team, week, day):
@@ -121,6 +631,7 @@ def get_shared_base_day(team, week, day):
     return plans.get(key)
 
 
+@_locked_update("file", SHARED_PLAN_FILE)
 def set_shared_base_day(team, week, day, base_day):
     plans = load_shared_plans()
     key = _shared_key(team, week, day)
@@ -133,40 +644,40 @@ def set_shared_base_day(team, week, day, base_day):
 # =========================
 
 def get_all_exercises():
+    """{name: default weight} for the built-in library (number or equipment tag)."""
     try:
         # ✅ Streamlit Cloud (package context)
-        from .exercises import (
-            delts, chest, biceps, butt,
-            back_lats, back_mids, back_lower, back_combo,
-            abs_upper, abs_lower, abs_combo,
-            triceps, calf, thighs
-        )
+        from .exercises import get_catalog
     except ImportError:
         # ✅ Local debugging (python helpers.py)
-        from exercises import (
-            delts, chest, biceps, butt,
-            back_lats, back_mids, back_lower, back_combo,
-            abs_upper, abs_lower, abs_combo,
-            triceps, calf, thighs
-        )
-
-    groups = [
-        delts, chest, biceps, butt,
-        back_lats, back_mids, back_lower, back_combo,
-        abs_upper, abs_lower, abs_combo,
-        triceps, calf, thighs
-    ]
-    all_ex = {}
-    for group in groups:
-        for name, weight in group:
-            all_ex[name] = weight
-    return all_ex
+        from exercises import get_catalog
+    return dict(get_catalog().weights)
 
 def get_base_weight(exercise_name):
     all_ex = get_all_exercises()
     return all_ex.get(exercise_name)
 
 
+def load_custom_exercises():
+    """{team_key: {exercise_name: {"muscle_group": str, "default_weight": number|str}}}"""
+    return _read_json(CUSTOM_EXERCISE_FILE)
+
+
+def get_custom_exercises_version():
+    return _file_version(CUSTOM_EXERCISE_FILE)
+
+
+@_locked_update("file", CUSTOM_EXERCISE_FILE)
+def add_custom_exercise(team, name, muscle_group, default_weight):
+    data = load_custom_exercises()
+    team_key = team.strip().lower()
+    data.setdefault(team_key, {})[name.strip()] = {
+        "muscle_group": muscle_group,
+        "default_weight": default_weight,
+    }
+    _write_json(CUSTOM_EXERCISE_FILE, data)
+
+
 # =========================
 # Weights & History (per user)
 # =========================
@@ -179,11 +690,15 @@ def save_weights(user, data):
     save_user_data(user, "weights", data)
 
 
+@_locked_update("user")
 def update_weight(user, exercise_name, new_weight):
     weights = load_weights(user)
     weights[exercise_name] = float(new_weight)
     save_weights(user, weights)
     log_weight_history(user, exercise_name, new_weight)
+    # An individual schedule's stored text shows their weights: refresh just those cells
+    if not get_user_team(user):
+        reformat_schedule_cells(user, exercise_name)
 
 
 def load_weight_history(user):
@@ -194,6 +709,7 @@ def save_weight_history(user, history):
     save_user_data(user, "weight_history", history)
 
 
+@_locked_update("user")
 def log_weight_history(user, exercise_name, new_weight):
     """Append a dated weight entry for tracking progression."""
     history = load_weight_history(user)
@@ -308,38 +824,21 @@ def generate_base_day(week_num: int, day_num: int):
 # User-specific formatting
 # =========================
 
-def format_exercise_for_user(exercise_name, week_num, user):
+def format_exercise_for_user(exercise_name, week_num, user, plan=None):
     """
     Convert exercise name into text with proper weight for this user + phase.
     Safe against double-formatting (won't add '(no weight assigned)' twice).
+    Weights come from the batch progression plan (see progression.py).
     """
     # 🧠 If it’s already formatted (contains "lbs", "Bodyweight", or "no weight"), just return it
     if any(x in exercise_name for x in ["lbs", "Bodyweight", "no weight assigned"]):
         return exercise_name
 
-    base = get_base_weight(exercise_name)
-    user_weights = load_weights(user)
-    weight = user_weights.get(exercise_name, base)
+    from progression import get_prescriptions, prescription_text
 
-    # Handle None or unknown weights gracefully
-    if weight is None:
-        return f"{exercise_name} — (no weight assigned)"
-
-    # Handle non-numeric (e.g., bands, cables, ankle weights)
-    if isinstance(weight, str):
-        return f"{exercise_name} — {weight}"
-
-    # Handle bodyweight exercises (0 weight)
-    if isinstance(weight, (int, float)) and weight == 0:
-        return f"{exercise_name} — Bodyweight"
-
-    # Normal numeric weights with phase logic
-    if week_num == 1:
-        return f"{exercise_name} — {weight} lbs, try {weight + 5} lbs"
-    elif week_num == 4:
-        return f"{exercise_name} — {round(weight / 2, 1)} lbs (deload)"
-    else:
-        return f"{exercise_name} — {weight} lbs"
+    if plan is None:
+        plan = get_prescriptions(user)
+    return prescription_text(plan, exercise_name, week_num)
 
 # =========================
 # Progress Tracking (per user)
@@ -348,9 +847,13 @@ def format_exercise_for_user(exercise_name, week_num, user):
 def build_user_day_from_base(base_day, week_num, user):
     """
     Given {group: exercise_name}, return {group: formatted_text} for that user.
+    The user's progression plan is fetched once for the whole day.
     """
+    from progression import get_prescriptions
+
+    plan = get_prescriptions(user)
     return {
-        group: format_exercise_for_user(ex_name, week_num, user)
+        group: format_exercise_for_user(ex_name, week_num, user, plan)
         for group, ex_name in base_day.items()
     }
 
@@ -362,44 +865,434 @@ def save_progress(user, progress):
     save_user_data(user, "progress", progress)
 
 
+@_locked_update("user")
 def mark_workout_done(user, week, day):
     progress = load_progress(user)
     key = f"Week {week} Day {day}"
+    previous = progress.get(key)
     progress[key] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    # Indexes first: a missing index is backfilled from the *old* progress file
+    _update_activity_index(user, remove=previous, add=progress[key])
+    _update_completion_mask(user, week, day, True)
     save_progress(user, progress)
 
 
+@_locked_update("user")
 def unmark_workout_done(user, week, day):
     progress = load_progress(user)
     key = f"Week {week} Day {day}"
     if key in progress:
-        del progress[key]
+        removed = progress.pop(key)
+        _update_activity_index(user, remove=removed)
+        _update_completion_mask(user, week, day, False)
         save_progress(user, progress)
 
 
 def check_workout_done(user, week, day):
-    progress = load_progress(user)
-    return f"Week {week} Day {day}" in progress
+    return is_workout_done(load_completion_mask(user), week, day)
+
+
+def load_set_progress(user):
+    """{"week{W}_day{D}": {exercise: [set1_done, set2_done, set3_done]}}"""
+    return load_user_data(user, "setprogress")
+
+
+def save_set_progress(user, set_progress):
+    save_user_data(user, "setprogress", set_progress)
+
+
+@_locked_update("user")
+def set_set_done(user, week, day, exercise, set_index, done=True):
+    """Toggle one set; returns the exercise's updated [bool, bool, bool] list."""
+    set_progress = load_set_progress(user)
+    sets = set_progress.setdefault(f"week{week}_day{day}", {}).setdefault(
+        exercise, [False, False, False]
+    )
+    sets.extend([False] * (set_index + 1 - len(sets)))
+    if sets[set_index] != bool(done):
+        sets[set_index] = bool(done)
+        save_set_progress(user, set_progress)
+    return sets
+
+
+# =========================
+# Activity versions (live team views)
+# =========================
+# Monotonic counters in the change notifier: one per user, bumped by every
+# progress / set-progress / completion save, and one per team, bumped by any
+# member's save and by roster changes. A live view polls its team's counter
+# (a single integer read) and only when it moves compares member counters
+# and re-reads the members that changed. Bumps happen once the file is
+# written, so with write-behind they follow the group commit.
+
+ACTIVITY_FILE_TYPES = frozenset({"progress", "setprogress", "completion"})
+
+
+def _user_activity_key(user):
+    return f"activity:{user}"
+
+
+def _team_activity_key(team):
+    return f"team-activity:{team.strip().lower()}"
+
+
+def _activity_signals(user):
+    team = get_user_team(user)
+    if team:
+        return (_user_activity_key(user), _team_activity_key(team))
+    return (_user_activity_key(user),)
+
+
+def get_activity_version(user):
+    return _change_notifier.generation(_user_activity_key(user))
+
+
+def get_team_activity_version(team):
+    return _change_notifier.generation(_team_activity_key(team))
+
+
+# =========================
+# Completion bitmask (current cycle)
+# =========================
+# A user's completion.json = {"cycle": n, "mask": int}, one bit per workout:
+# bit (week - 1) * 4 + (day - 1). It sits next to the timestamped progress
+# file, so week counts, totals and grid cells are popcounts and bit tests
+# instead of re-splitting "Week W Day D" keys.
+
+WEEKS_PER_CYCLE = DAYS_PER_WEEK = 4
+WEEK_MASK = (1 << DAYS_PER_WEEK) - 1
+
+
+def completion_bit(week, day):
+    return 1 << ((int(week) - 1) * DAYS_PER_WEEK + (int(day) - 1))
+
+
+def mask_from_progress(progress):
+    mask = 0
+    for key in progress:
+        parts = key.split()
+        if len(parts) != 4 or parts[0] != "Week" or parts[2] != "Day":
+            continue
+        try:
+            week, day = int(parts[1]), int(parts[3])
+        except ValueError:
+            continue
+        if 1 <= week <= WEEKS_PER_CYCLE and 1 <= day <= DAYS_PER_WEEK:
+            mask |= completion_bit(week, day)
+    return mask
+
+
+def load_completion_mask(user, stored=None):
+    """The user's completion bits; `stored` is their already-loaded completion file."""
+    if stored is None:
+        stored = load_user_data(user, "completion")
+    if "mask" in stored:
+        return int(stored["mask"])
+    return mask_from_progress(load_progress(user))  # no bitmask yet: backfill
+
+
+def save_completion_mask(user, mask):
+    save_user_data(user, "completion", {"cycle": get_current_cycle(user), "mask": int(mask)})
+
+
+@_locked_update("user")
+def rebuild_completion_mask(user):
+    """Recompute the bitmask from progress (after progress is written out of band)."""
+    save_completion_mask(user, mask_from_progress(load_progress(user)))
+
+
+@_locked_update("user")
+def _update_completion_mask(user, week, day, done):
+    if not (1 <= int(week) <= WEEKS_PER_CYCLE and 1 <= int(day) <= DAYS_PER_WEEK):
+        return
+    mask = load_completion_mask(user)
+    bit = completion_bit(week, day)
+    save_completion_mask(user, mask | bit if done else mask & ~bit)
+
+
+def is_workout_done(mask, week, day):
+    return bool(mask & completion_bit(week, day))
+
+
+def week_done_count(mask, week):
+    return ((mask >> ((int(week) - 1) * DAYS_PER_WEEK)) & WEEK_MASK).bit_count()
+
+
+def total_done_count(mask):
+    return mask.bit_count()
+
+
+# =========================
+# Activity timestamp index (time-windowed leaderboards)
+# =========================
+# A user's activity.json keeps every completion time (epoch seconds, sorted)
+# across cycles, so "last N days" counts are two bisects instead of a
+# re-parse of the progress file. Parsed indexes are cached per file version.
+
+def timestamp_to_epoch(stamp):
+    try:
+        return int(datetime.strptime(stamp, "%Y-%m-%d %H:%M:%S").timestamp())
+    except (TypeError, ValueError):
+        return None
+
+
+@_locked_update("user")
+def _update_activity_index(user, remove=None, add=None):
+    timestamps = load_activity_timestamps(user)
+    old_ts, new_ts = timestamp_to_epoch(remove), timestamp_to_epoch(add)
+    if old_ts is not None:
+        i = bisect.bisect_left(timestamps, old_ts)
+        if i < len(timestamps) and timestamps[i] == old_ts:
+            timestamps.pop(i)
+    if new_ts is not None:
+        bisect.insort(timestamps, new_ts)
+    save_user_data(user, "activity", {"timestamps": timestamps})
+
+
+@_locked_update("user")
+def rebuild_activity_index(user):
+    """
+    Add progress completions missing from the activity index (after progress
+    is written out of band). Earlier cycles' entries are kept.
+    """
+    timestamps = load_activity_timestamps(user)
+    for stamp in load_progress(user).values():
+        epoch = timestamp_to_epoch(stamp)
+        if epoch is None:
+            continue
+        i = bisect.bisect_left(timestamps, epoch)
+        if i == len(timestamps) or timestamps[i] != epoch:
+            timestamps.insert(i, epoch)
+    save_user_data(user, "activity", {"timestamps": timestamps})
+
+
+_activity_cache = LRUCache(USER_CACHE_MAX_ENTRIES)  # {user: (version, timestamps)}
+
+
+def load_activity_timestamps(user):
+    """Sorted completion times for a user (backfilled from progress if no index yet)."""
+    version = (get_data_version(user, "activity"), get_data_version(user, "progress"))
+    cached = _activity_cache.get(user)
+    if cached is not None:
+        if cached[0] == version:
+            return list(cached[1])
+        _activity_cache.pop(user, None)
+
+    stored = load_user_data(user, "activity")
+    if "timestamps" in stored:
+        timestamps = sorted(int(t) for t in stored["timestamps"])
+    else:
+        epochs = (timestamp_to_epoch(v) for v in load_progress(user).values())
+        timestamps = sorted(t for t in epochs if t is not None)
+    _activity_cache[user] = (version, timestamps)
+    return list(timestamps)
+
+
+def count_activity_between(timestamps, start=None, end=None):
+    """Number of sorted timestamps in [start, end); None means unbounded."""
+    lo = 0 if start is None else bisect.bisect_left(timestamps, start)
+    hi = len(timestamps) if end is None else bisect.bisect_left(timestamps, end)
+    return max(0, hi - lo)
+
 
 USER_SCHEDULES_DIR = "user_schedules"
 
+def get_schedule_file(username):
+    return os.path.join(_shard_dir(USER_SCHEDULES_DIR, username), "schedule.json")
+
+def legacy_schedule_file(username):
+    return os.path.join(USER_SCHEDULES_DIR, f"{username}_schedule.json")
+
 def load_user_schedule(username):
     """Load a user's saved workout schedule or return an empty one."""
-    if not os.path.exists(USER_SCHEDULES_DIR):
-        os.makedirs(USER_SCHEDULES_DIR)
-    file_path = os.path.join(USER_SCHEDULES_DIR, f"{username}_schedule.json")
-    if os.path.exists(file_path):
-        with open(file_path, "r") as f:
-            try:
-                return json.load(f)
-            except json.JSONDecodeError:
-                return {}
-    return {}
+    return _read_json_with_fallback(get_schedule_file(username), legacy_schedule_file(username))
+
+def get_schedule_version(username):
+    """Generation of a saved schedule; changes on every save from any process."""
+    return _file_version(get_schedule_file(username))
+
+def get_all_schedule_keys():
+    """Schedule keys (users or teams) that have a saved schedule."""
+    keys = _sharded_keys(USER_SCHEDULES_DIR)
+    suffix = "_schedule.json"
+    keys.update(
+        fname[:-len(suffix)]
+        for fname in _list_dir(USER_SCHEDULES_DIR)
+        if fname.endswith(suffix)
+    )
+    return sorted(keys)
+
+def get_day_plan(username, schedule_key, week, day):
+    """Stored {group: text} plan for a day, generating and saving it if missing."""
+    with update_lock("schedule", schedule_key), fresh_reads():
+        schedule = load_user_schedule(schedule_key)
+        plan = schedule.get(str(week), {}).get(str(day))
+        if plan is None:
+            plan = build_user_day_from_base(generate_base_day(week, day), week, username)
+            schedule.setdefault(str(week), {})[str(day)] = plan
+            save_user_schedule(schedule_key, schedule)
+        return plan
 
 def save_user_schedule(username, schedule):
     """Save the workout schedule for a specific user."""
-    if not os.path.exists(USER_SCHEDULES_DIR):
-        os.makedirs(USER_SCHEDULES_DIR)
-    file_path = os.path.join(USER_SCHEDULES_DIR, f"{username}_schedule.json")
-    with open(file_path, "w") as f:
-        json.dump(schedule, f, indent=4)
+    _write_json(get_schedule_file(username), schedule)
+
+
+# =========================
+# Schedule cell index (exercise -> stored cells)
+# =========================
+# Stored cells bake the formatting user's weights into their text. Instead
+# of regenerating days after a weight change, update_weight looks up the
+# cells showing that exercise here and re-formats only those. The index is
+# built once per schedule version; a re-format only changes weights, never
+# which exercise a cell shows, so it carries the index over to the version
+# it saves. Only individual schedules are re-formatted: a team schedule is
+# shared by every member, and ScheduleView.day() formats its cells per
+# viewer anyway.
+
+_cell_index = LRUCache(USER_CACHE_MAX_ENTRIES)  # {schedule_key: (schedule version, {exercise: [(week, day, group), ...]})}
+
+
+def _build_cell_index(schedule):
+    index = {}
+    for week, days in schedule.items():
+        if not (isinstance(days, dict) and str(week).isdigit() and 1 <= int(week) <= WEEKS_PER_CYCLE):
+            continue
+        for day, plan in days.items():
+            for group, text in (plan or {}).items():
+                if group.endswith("(Custom)") or not isinstance(text, str):
+                    continue
+                name = text.split(" — ")[0].strip()
+                if name:
+                    index.setdefault(name, []).append((week, day, group))
+    return index
+
+
+def reformat_schedule_cells(user, exercise_name):
+    """
+    Re-format the cells of `user`'s individual schedule that show
+    `exercise_name` with their current prescription, and save them.
+    Returns the number of cells rewritten.
+    """
+    schedule_key = user.strip().lower()
+    with update_lock("schedule", schedule_key), fresh_reads():
+        return _reformat_cells(user, schedule_key, exercise_name)
+
+
+def _reformat_cells(user, schedule_key, exercise_name):
+    # Version before contents, as in _read_raw: a concurrent save is never missed
+    version = get_schedule_version(schedule_key)
+    schedule = load_user_schedule(schedule_key)
+    entry = _cell_index.get(schedule_key)
+    if entry is None or entry[0] != version:
+        entry = (version, _build_cell_index(schedule))
+        _cell_index[schedule_key] = entry
+    cells = entry[1].get(exercise_name)
+    if not cells:
+        return 0
+
+    from progression import get_prescriptions, prescription_text
+
+    plan = get_prescriptions(user)
+    changed = 0
+    for week, day, group in cells:
+        day_plan = schedule[week][day]
+        text = prescription_text(plan, exercise_name, int(week))
+        if day_plan[group] != text:
+            day_plan[group] = text
+            changed += 1
+    if changed:
+        save_user_schedule(schedule_key, schedule)
+        _cell_index[schedule_key] = (get_schedule_version(schedule_key), entry[1])
+    return changed
+
+
+# =========================
+# Training cycles (hot data + archive)
+# =========================
+# The current cycle lives in the usual small "hot" files (progress,
+# setprogress, schedule). Finishing a cycle compacts those into one
+# zlib-compressed archive segment per cycle and records a short summary in
+# the user's cycles.json, so views only ever read hot data while past cycles
+# stay loadable on demand.
+
+ARCHIVE_DIR = os.path.join(USER_DIR, "archive")  # flat layout only
+
+
+def get_cycle_archive_file(user, cycle):
+    return os.path.join(_shard_dir(USER_DIR, user), "archive", f"cycle{cycle}.json")
+
+
+def legacy_cycle_archive_file(user, cycle):
+    return os.path.join(ARCHIVE_DIR, f"{user}_cycle{cycle}.json")
+
+
+def get_current_cycle(user):
+    return int(get_user_meta(user).get("cycle", 1))
+
+
+def list_cycles(user):
+    """Summary index of completed cycles: {cycle_number(str): {...}}."""
+    return load_user_data(user, "cycles")
+
+
+def load_cycle(user, cycle):
+    """Full archived data for a past cycle (progress, setprogress, schedule)."""
+    return _read_json_with_fallback(get_cycle_archive_file(user, cycle), legacy_cycle_archive_file(user, cycle))
+
+
+@_locked_update("user")
+def start_new_cycle(user, schedule_key=None):
+    """
+    Archive the user's current cycle and reset their hot files.
+    An individual schedule (schedule_key == user) is reset too; a team
+    schedule is only snapshotted, since teammates may still be on it.
+    Returns the new cycle number.
+    """
+    meta = get_user_meta(user)
+    cycle = int(meta.get("cycle", 1))
+    progress = load_progress(user)
+    set_progress = load_set_progress(user)
+    overlay = load_user_data(user, "schedule_overlay")
+    schedule = load_user_schedule(schedule_key) if schedule_key else {}
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    _write_json(
+        get_cycle_archive_file(user, cycle),
+        {
+            "cycle": cycle,
+            "schedule_key": schedule_key,
+            "progress": progress,
+            "setprogress": set_progress,
+            "schedule": schedule,
+            "schedule_overlay": overlay,
+        },
+        codec_name="zlib",
+    )
+
+    index = list_cycles(user)
+    index[str(cycle)] = {
+        "started": meta.get("cycle_started"),
+        "ended": now,
+        "schedule_key": schedule_key,
+        "workouts_completed": len(progress),
+        "completion_mask": load_completion_mask(user),
+        "sets_completed": sum(
+            sum(bool(s) for s in sets)
+            for day in set_progress.values()
+            for sets in day.values()
+        ),
+    }
+    save_user_data(user, "cycles", index)
+
+    save_progress(user, {})
+    save_set_progress(user, {})
+    save_user_data(user, "completion", {"cycle": cycle + 1, "mask": 0})
+    save_user_data(user, "schedule_overlay", {})
+    if schedule_key and schedule_key == user.strip().lower():
+        save_user_schedule(schedule_key, {})
+
+    meta["cycle"] = cycle + 1
+    meta["cycle_started"] = now
+    save_user_meta(user, meta)
+    return cycle + 1
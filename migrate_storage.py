@@ -0,0 +1,94 @@
+"""
+Move data from the old flat layout into the sharded one.
+
+    python migrate_storage.py [--dry-run]
+
+Old:  user_data/<user>_<type>.json
+      user_data/archive/<user>_cycle<n>.json
+      user_schedules/<key>_schedule.json
+New:  user_data/ab/cd/<user>/<type>.json
+      user_data/ab/cd/<user>/archive/cycle<n>.json
+      user_schedules/ab/cd/<key>/schedule.json
+
+Safe to run while the app is serving. helpers reads the new path first
+and falls back to the old one, and writes only ever go to the new path.
+Each file is hard-linked into place, which fails if the new file already
+exists, and only then is the old name removed. If the app already saved
+a newer copy under the new path, the stale flat file is simply dropped.
+Readers see the same bytes at every step, and the new path's generation
+is bumped so every process's cache re-reads it. Re-running the tool is a
+no-op.
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from helpers import (
+    ARCHIVE_DIR,
+    USER_DIR,
+    USER_SCHEDULES_DIR,
+    get_cycle_archive_file,
+    get_schedule_file,
+    get_user_file,
+    notify_file_replaced,
+    parse_legacy_user_file,
+)
+
+
+def legacy_files():
+    """(old path, new path) for every file still in the flat layout."""
+    if os.path.isdir(USER_DIR):
+        for entry in os.scandir(USER_DIR):
+            parsed = parse_legacy_user_file(entry.name) if entry.is_file() else None
+            if parsed:
+                yield entry.path, get_user_file(*parsed)
+
+    if os.path.isdir(ARCHIVE_DIR):
+        for entry in os.scandir(ARCHIVE_DIR):
+            user, sep, cycle = entry.name[:-len(".json")].rpartition("_cycle")
+            if entry.is_file() and entry.name.endswith(".json") and sep and cycle.isdigit():
+                yield entry.path, get_cycle_archive_file(user, int(cycle))
+
+    if os.path.isdir(USER_SCHEDULES_DIR):
+        suffix = "_schedule.json"
+        for entry in os.scandir(USER_SCHEDULES_DIR):
+            if entry.is_file() and entry.name.endswith(suffix):
+                yield entry.path, get_schedule_file(entry.name[:-len(suffix)])
+
+
+def migrate_file(old, new):
+    """Returns "moved" or "superseded" (the new path already had newer data)."""
+    os.makedirs(os.path.dirname(new), exist_ok=True)
+    try:
+        os.link(old, new)
+        outcome = "moved"
+    except FileExistsError:
+        outcome = "superseded"
+    os.remove(old)
+    if outcome == "moved":
+        notify_file_replaced(new)
+    return outcome
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Migrate flat storage files into the sharded layout.")
+    parser.add_argument("--dry-run", action="store_true", help="list what would move")
+    args = parser.parse_args(argv)
+
+    counts = {"moved": 0, "superseded": 0}
+    for old, new in legacy_files():
+        if args.dry_run:
+            print(f"{old} -> {new}")
+            counts["moved"] += 1
+        else:
+            counts[migrate_file(old, new)] += 1
+
+    verb = "would move" if args.dry_run else "moved"
+    print(f"{verb} {counts['moved']} files, dropped {counts['superseded']} superseded flat copies")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Team-hash partitioning across several app nodes.
+
+Every schedule key (a team, or an individual's own name) is owned by
+exactly one node, chosen by hashing the key. A node keeps only its own
+partition's user_data/ and user_schedules/ (helpers works relative to
+the process's working directory, so each node simply runs from its own
+data root). Teammates always land together, which keeps a team's shared
+schedule and overlays local to one node.
+
+    WORKOUT_NODES      comma-separated API base URLs, one per partition,
+                       e.g. http://10.0.0.1:8502,http://10.0.0.2:8502
+    WORKOUT_APP_NODES  the matching Streamlit URLs, same order (optional)
+    WORKOUT_NODE_INDEX this process's own partition index
+
+With WORKOUT_NODES unset everything runs as a single partition. router.py
+forwards API calls to the owning node and scatter-gathers the leaderboard;
+cluster.py starts a local multi-process stand-in.
+
+Moving a user to a team owned by another node does not move their files.
+Login sends them to the owning node, where they start with fresh progress;
+their earlier history (progress, weights, cycles and archives, overlays)
+stays on the old node. There is no re-homing tool: data_export.py is a
+whole-store export and doesn't carry every per-user file.
+"""
+
+import hashlib
+import http.client
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote, urlsplit
+
+
+def _url_list(value):
+    return [url.strip().rstrip("/") for url in (value or "").split(",") if url.strip()]
+
+
+NODES = _url_list(os.environ.get("WORKOUT_NODES"))
+APP_NODES = _url_list(os.environ.get("WORKOUT_APP_NODES"))
+GATHER_TIMEOUT = float(os.environ.get("WORKOUT_GATHER_TIMEOUT", "5"))
+LOCAL_PARTITION = int(os.environ["WORKOUT_NODE_INDEX"]) if os.environ.get("WORKOUT_NODE_INDEX") else None
+
+
+def is_partitioned():
+    return len(NODES) > 1
+
+
+def routing_key(user, team=None):
+    """The schedule key a user's data is partitioned by."""
+    return (team or user or "").strip().lower()
+
+
+def partition_of(key, n_partitions=None):
+    """Stable partition index for a schedule key."""
+    n = n_partitions or max(1, len(NODES))
+    digest = hashlib.sha1(key.strip().lower().encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % n
+
+
+def owner_node(key):
+    """(partition, API URL, app URL or None) owning `key`."""
+    i = partition_of(key)
+    return i, NODES[i] if NODES else None, APP_NODES[i] if i < len(APP_NODES) else None
+
+
+def foreign_owner(key):
+    """The owning node's app URL when another node owns `key`, else None."""
+    if not is_partitioned() or LOCAL_PARTITION is None:
+        return None
+    partition, _, app_url = owner_node(key)
+    return None if partition == LOCAL_PARTITION else (app_url or f"partition {partition}")
+
+
+# =========================
+# Node client (one keep-alive connection per node per thread)
+# =========================
+
+_local = threading.local()
+
+
+def node_request(base_url, method, path, body=None, headers=None, timeout=GATHER_TIMEOUT):
+    """Send one request to a node. Returns (status, headers dict, body bytes)."""
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+    url = urlsplit(base_url)
+    for attempt in range(2):
+        conn = conns.get(base_url)
+        if conn is None:
+            conn = conns[base_url] = http.client.HTTPConnection(url.hostname, url.port, timeout=timeout)
+        try:
+            conn.request(method, url.path + path, body=body, headers=headers or {})
+            response = conn.getresponse()
+            return response.status, dict(response.getheaders()), response.read()
+        except (ConnectionError, http.client.HTTPException):
+            # The node closed an idle keep-alive connection: reconnect once
+            conn.close()
+            del conns[base_url]
+            if attempt:
+                raise
+
+
+# =========================
+# Scatter-gather leaderboard
+# =========================
+
+_gather_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="gather")
+
+
+def _fetch_partition(base_url, window):
+    status, _, raw = node_request(base_url, "GET", f"/leaderboard?window={quote(window)}")
+    if status != 200:
+        raise ConnectionError(f"{base_url} answered {status}")
+    return json.loads(raw)["rows"]
+
+
+def gather_progress_snapshot(window="This cycle", nodes=None):
+    """
+    build_progress_snapshot over every partition: ({user: data}, [unreachable
+    node URLs]). Each node aggregates its own users and the merge is a dict
+    union, since a user lives on exactly one node.
+    """
+    nodes = NODES if nodes is None else nodes
+    futures = {url: _gather_pool.submit(_fetch_partition, url, window) for url in nodes}
+    snapshot, missing = {}, []
+    for url, future in futures.items():
+        try:
+            rows = future.result(timeout=GATHER_TIMEOUT)
+        except Exception:
+            missing.append(url)
+            continue
+        for row in rows:
+            user = row.pop("user")
+            snapshot[user] = row
+    return snapshot, missing
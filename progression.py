@@ -0,0 +1,135 @@
+"""
+Progressive-overload engine.
+
+Computes the prescribed weight for *all* of a user's exercises and all
+four phases in one vectorized pass over their weights, weight history and
+completed-set data. The result is cached per user until any of those files
+gets a new version, so formatting a day costs one dict lookup per cell.
+Plans are kept for the WORKOUT_USER_CACHE_ENTRIES most recently used users.
+
+Rules (per exercise, w = current working weight):
+  Week 1        w lbs, try w + 5 unless the last tracked session had missed sets
+  Weeks 2–3     w lbs, try w + 5 once the last tracked session hit every set
+  Week 4        w / 2 (deload)
+"""
+
+import numpy as np
+
+from analytics import sets_frame
+from exercises import get_catalog_version
+from helpers import (
+    USER_CACHE_MAX_ENTRIES,
+    get_all_exercises,
+    get_data_version,
+    load_weights,
+    load_weight_history,
+    load_set_progress,
+)
+from utils.lru import LRUCache
+
+INCREMENT_LBS = 5
+DELOAD_FACTOR = 0.5
+WEEKS = 4
+
+
+def _fmt(x):
+    x = round(float(x), 1)
+    return str(int(x)) if x.is_integer() else str(x)
+
+
+# =========================
+# Batch computation
+# =========================
+
+def compute_prescriptions(base_weights, user_weights, weight_history, set_progress):
+    """
+    Returns {"index": {exercise: row}, "load": (n, 4) array, "target": (n, 4) array,
+    "labels": {exercise: str}}. load/target are NaN where an exercise has no
+    numeric weight; labels hold equipment tags ("band", "cables", ...).
+    """
+    last_logged = {
+        ex: entries[-1].get("weight") for ex, entries in weight_history.items() if entries
+    }
+    names = sorted(set(base_weights) | set(user_weights) | set(last_logged))
+    index = {name: i for i, name in enumerate(names)}
+
+    raw = [user_weights.get(n, last_logged.get(n, base_weights.get(n))) for n in names]
+    labels = {n: v for n, v in zip(names, raw) if isinstance(v, str)}
+    current = np.array(
+        [float(v) if isinstance(v, (int, float)) else np.nan for v in raw], dtype=float
+    )
+
+    # Completion ratio of each exercise's most recent tracked session
+    ratio = np.full(len(names), np.nan)
+    sets = sets_frame(set_progress)
+    if not sets.empty:
+        latest = sets.sort_values(["week", "day"], kind="stable").groupby("exercise").last()
+        rows = latest.index.map(index)
+        known = ~rows.isna()
+        ratio[rows[known].astype(int)] = latest["sets_done"].to_numpy()[known] / 3
+
+    has_data = ~np.isnan(ratio)
+    hit_all = has_data & (ratio >= 1.0)
+
+    load = np.repeat(current[:, None], WEEKS, axis=1)
+    load[:, 3] = np.round(current * DELOAD_FACTOR, 1)
+
+    suggest = np.zeros((len(names), WEEKS), dtype=bool)
+    suggest[:, 0] = ~has_data | hit_all
+    suggest[:, 1] = hit_all
+    suggest[:, 2] = hit_all
+    target = np.where(suggest, current[:, None] + INCREMENT_LBS, np.nan)
+
+    return {"index": index, "load": load, "target": target, "labels": labels}
+
+
+def prescription_text(plan, exercise_name, week_num):
+    """Format one cell from a precomputed plan."""
+    row = plan["index"].get(exercise_name)
+    if row is None:
+        return f"{exercise_name} — (no weight assigned)"
+    if exercise_name in plan["labels"]:
+        return f"{exercise_name} — {plan['labels'][exercise_name]}"
+
+    load = plan["load"][row, week_num - 1]
+    if np.isnan(load):
+        return f"{exercise_name} — (no weight assigned)"
+    if load == 0:
+        return f"{exercise_name} — Bodyweight"
+    if week_num == 4:
+        return f"{exercise_name} — {_fmt(load)} lbs (deload)"
+
+    target = plan["target"][row, week_num - 1]
+    if not np.isnan(target):
+        return f"{exercise_name} — {_fmt(load)} lbs, try {_fmt(target)} lbs"
+    return f"{exercise_name} — {_fmt(load)} lbs"
+
+
+# =========================
+# Cached per data version
+# =========================
+
+_cache = LRUCache(USER_CACHE_MAX_ENTRIES)  # {user: (versions, plan)}
+
+
+def get_prescriptions(user):
+    versions = (
+        get_data_version(user, "weights"),
+        get_data_version(user, "weight_history"),
+        get_data_version(user, "setprogress"),
+        get_catalog_version(),
+    )
+    cached = _cache.get(user)
+    if cached is not None:
+        if cached[0] == versions:
+            return cached[1]
+        _cache.pop(user, None)  # don't hold the stale result while recomputing
+
+    plan = compute_prescriptions(
+        get_all_exercises(),
+        load_weights(user),
+        load_weight_history(user),
+        load_set_progress(user),
+    )
+    _cache[user] = (versions, plan)
+    return plan
@@ -0,0 +1,215 @@
+"""
+Printable progress reports: one weight-over-time chart per exercise for a
+user (or one chart per exercise with a line per member for a team), laid
+out as a multi-page PDF or a single PNG sprite sheet.
+
+Charts are drawn in parallel on a process pool with the non-interactive
+Agg backend (pyplot is never touched), each worker returning one PNG tile;
+the tiles are then pasted onto pages. request_report() hands back a
+Future right away, so the Streamlit script thread never waits on
+rendering, and finished reports are cached per history version.
+"""
+
+import io
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
+
+from helpers import get_data_version, get_team_index, load_weight_history
+
+REPORT_DPI = 100
+TILE_SIZE = (4.0, 2.6)            # inches per chart
+PAGE_SIZE = (8.5, 11.0)           # letter, portrait
+PAGE_GRID = (2, 4)                # columns, rows of charts per page
+SPRITE_COLUMNS = 6
+REPORT_WORKERS = int(os.environ.get("WORKOUT_REPORT_WORKERS", "0")) or os.cpu_count() or 1
+CACHE_SIZE = 32
+
+FORMATS = {"pdf": "application/pdf", "png": "image/png"}
+
+
+# =========================
+# Chart rendering (runs in the worker processes)
+# =========================
+
+def _init_worker():
+    import matplotlib
+    matplotlib.use("Agg")
+
+
+def _parse_date(stamp):
+    try:
+        return datetime.strptime(stamp, "%Y-%m-%d %H:%M")
+    except (TypeError, ValueError):
+        return None
+
+
+def render_chart(title, series):
+    """PNG bytes for one exercise: series = [(label, [(date, weight), ...]), ...]."""
+    from matplotlib.figure import Figure
+    import matplotlib.dates as mdates
+
+    fig = Figure(figsize=TILE_SIZE, dpi=REPORT_DPI)
+    ax = fig.subplots()
+    for label, points in series:
+        points = [(_parse_date(d), w) for d, w in points]
+        points = [(d, w) for d, w in points if d is not None and w is not None]
+        if points:
+            dates, weights = zip(*points)
+            ax.plot(dates, weights, marker="o", linewidth=1.5, markersize=3, label=label)
+    ax.set_title(title, fontsize=9)
+    ax.set_ylabel("lbs", fontsize=8)
+    ax.tick_params(labelsize=7)
+    ax.xaxis.set_major_locator(mdates.AutoDateLocator(maxticks=5))
+    ax.xaxis.set_major_formatter(mdates.DateFormatter("%b %d"))
+    if len(series) > 1:
+        ax.legend(fontsize=6, loc="upper left")
+    # Fixed margins: tight_layout would cost an extra full draw per chart
+    fig.subplots_adjust(left=0.14, right=0.97, bottom=0.13, top=0.88)
+    out = io.BytesIO()
+    fig.savefig(out, format="png")
+    return out.getvalue()
+
+
+def _render_job(job):
+    return render_chart(*job)
+
+
+# =========================
+# Layout (parent process)
+# =========================
+
+def _tiles_to_images(tiles):
+    from PIL import Image
+    return [Image.open(io.BytesIO(tile)).convert("RGB") for tile in tiles]
+
+
+def _header(image, text):
+    from PIL import ImageDraw
+    ImageDraw.Draw(image).text((int(0.4 * REPORT_DPI), int(0.2 * REPORT_DPI)), text, fill="black")
+
+
+def assemble_pdf(title, tiles):
+    """Letter pages with PAGE_GRID charts each."""
+    from PIL import Image
+    images = _tiles_to_images(tiles)
+    cols, rows = PAGE_GRID
+    page_w, page_h = int(PAGE_SIZE[0] * REPORT_DPI), int(PAGE_SIZE[1] * REPORT_DPI)
+    tile_w, tile_h = int(TILE_SIZE[0] * REPORT_DPI), int(TILE_SIZE[1] * REPORT_DPI)
+    margin_x = (page_w - cols * tile_w) // 2
+    top = int(0.5 * REPORT_DPI)
+
+    per_page = cols * rows
+    pages = []
+    for start in range(0, max(1, len(images)), per_page):
+        page = Image.new("RGB", (page_w, page_h), "white")
+        n_pages = max(1, -(-len(images) // per_page))
+        _header(page, f"{title} - page {start // per_page + 1}/{n_pages}")
+        for i, image in enumerate(images[start:start + per_page]):
+            r, c = divmod(i, cols)
+            page.paste(image, (margin_x + c * tile_w, top + r * tile_h))
+        pages.append(page)
+
+    out = io.BytesIO()
+    pages[0].save(out, format="PDF", save_all=True, append_images=pages[1:], resolution=REPORT_DPI)
+    return out.getvalue()
+
+
+def assemble_sprite(title, tiles):
+    """One PNG with SPRITE_COLUMNS charts per row."""
+    from PIL import Image
+    images = _tiles_to_images(tiles)
+    tile_w, tile_h = int(TILE_SIZE[0] * REPORT_DPI), int(TILE_SIZE[1] * REPORT_DPI)
+    cols = max(1, min(SPRITE_COLUMNS, len(images)))
+    rows = max(1, -(-len(images) // cols))
+    top = int(0.5 * REPORT_DPI)
+    sheet = Image.new("RGB", (cols * tile_w, top + rows * tile_h), "white")
+    _header(sheet, title)
+    for i, image in enumerate(images):
+        r, c = divmod(i, cols)
+        sheet.paste(image, (c * tile_w, top + r * tile_h))
+    out = io.BytesIO()
+    sheet.save(out, format="PNG", optimize=False)
+    return out.getvalue()
+
+
+# =========================
+# Report jobs
+# =========================
+
+def _members(scope, owner):
+    if scope == "team":
+        entry = get_team_index().get(owner.strip().lower())
+        return sorted(entry["members"]) if entry else []
+    return [owner]
+
+
+def report_jobs(scope, owner):
+    """[(chart title, series), ...], one per exercise, in name order."""
+    by_exercise = {}
+    for member in _members(scope, owner):
+        for exercise, entries in load_weight_history(member).items():
+            points = [(e.get("date"), e.get("weight")) for e in entries]
+            if points:
+                by_exercise.setdefault(exercise, []).append((member, points))
+    return [(name, by_exercise[name]) for name in sorted(by_exercise, key=str.lower)]
+
+
+def report_version(scope, owner):
+    """Changes whenever any included weight history is saved."""
+    return tuple((m, get_data_version(m, "weight_history")) for m in _members(scope, owner))
+
+
+_pool = None
+_pool_lock = threading.Lock()
+_orchestrator = ThreadPoolExecutor(max_workers=2, thread_name_prefix="report")
+_cache = OrderedDict()  # {(scope, owner, fmt, version): bytes}
+_cache_lock = threading.Lock()
+
+
+def _render_pool():
+    # spawn, not fork: the Streamlit server is multi-threaded
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=REPORT_WORKERS, mp_context=get_context("spawn"), initializer=_init_worker
+            )
+        return _pool
+
+
+def build_report(scope, owner, fmt="pdf"):
+    """Render a report synchronously (charts still fan out over the pool)."""
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of {list(FORMATS)}")
+    key = (scope, owner, fmt, report_version(scope, owner))
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+
+    jobs = report_jobs(scope, owner)
+    tiles = list(_render_pool().map(_render_job, jobs, chunksize=4)) if jobs else []
+    title = f"{'Team ' if scope == 'team' else ''}{owner} - progress report ({len(jobs)} exercises)"
+    data = assemble_pdf(title, tiles) if fmt == "pdf" else assemble_sprite(title, tiles)
+
+    with _cache_lock:
+        _cache[key] = data
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return data
+
+
+def request_report(scope, owner, fmt="pdf"):
+    """A Future for the report bytes; already resolved on a cache hit."""
+    key = (scope, owner, fmt, report_version(scope, owner))
+    with _cache_lock:
+        cached = _cache.get(key)
+    if cached is not None:
+        future = Future()
+        future.set_result(cached)
+        return future
+    return _orchestrator.submit(build_report, scope, owner, fmt)
@@ -0,0 +1,181 @@
+"""
+Routing layer in front of partitioned API nodes (see partitioning.py).
+
+    WORKOUT_NODES=http://127.0.0.1:8601,http://127.0.0.1:8602 \
+        python router.py [--host 0.0.0.0] [--port 8600]
+
+Same endpoints as api_server.py, plus:
+    GET /route?user=U[&team=T][&redirect=1]   owning node for a session
+
+/users/{user}/... requests are forwarded unchanged to the node owning the
+user's schedule key, which the client must send as the `team` (or
+`schedule_key`) query parameter; an individual sends their own name. The
+router keeps no user directory, and guessing from the user name would put
+a team member's writes on the wrong partition, so requests without it are
+rejected with 400. /leaderboard is scatter-gathered
+from every node and merged here. /route tells a client, or a load balancer
+doing sticky sessions, which app node to open; with redirect=1 it answers
+307 to that node's Streamlit URL.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from api_server import ApiError
+from partitioning import NODES, gather_progress_snapshot, node_request, owner_node, routing_key
+from standings import WINDOWS
+
+USER_PATH = re.compile(r"^/users/([^/]+)/")
+FORWARDED_HEADERS = ("Content-Type", "ETag", "Server-Timing")
+
+
+def get_route(query):
+    user = query.get("user")
+    if not user:
+        raise ApiError(400, "'user' is required")
+    key = routing_key(user, query.get("team") or query.get("schedule_key"))
+    partition, api_url, app_url = owner_node(key)
+    return {"schedule_key": key, "partition": partition, "api": api_url, "app": app_url}
+
+
+def get_leaderboard(query):
+    window = query.get("window") or "This cycle"
+    if window not in WINDOWS:
+        raise ApiError(400, f"'window' must be one of {list(WINDOWS)}")
+    snapshot, missing = gather_progress_snapshot(window)
+    rows = sorted(snapshot.items(), key=lambda item: (-item[1]["window"], item[0].lower()))
+    return {"window": window, "rows": [{"user": u, **data} for u, data in rows], "missing": missing}
+
+
+class RouterHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    server_version = "WorkoutRouter/1.0"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_raw(self, status, body, headers, started):
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        timing = f"route;dur={(time.perf_counter() - started) * 1000:.3f}"
+        upstream = headers.get("Server-Timing")
+        if upstream:
+            timing = f"{upstream}, {timing}"
+        self.send_header("Server-Timing", timing)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send(self, status, payload, started, etag_check=False):
+        body = json.dumps(payload, separators=(",", ":")).encode()
+        headers = {"Content-Type": "application/json"}
+        if etag_check:
+            etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+            headers["ETag"] = etag
+            if self.headers.get("If-None-Match") == etag:
+                body, headers = b"", {"ETag": etag}
+                status = 304
+        self._send_raw(status, body, headers, started)
+
+    def _forward(self, method, url, query, body, started):
+        user = unquote(USER_PATH.match(url.path).group(1))
+        key = query.get("team") or query.get("schedule_key")
+        if not key:
+            raise ApiError(400, "'team' or 'schedule_key' is required to route /users/ requests")
+        _, api_url, _ = owner_node(routing_key(user, key))
+        headers = {k: v for k, v in self.headers.items() if k in ("Content-Type", "If-None-Match")}
+        try:
+            status, upstream_headers, raw = node_request(api_url, method, self.path, body or None, headers)
+        except OSError:
+            raise ApiError(502, f"partition at {api_url} is unreachable")
+        kept = {k: v for k, v in upstream_headers.items() if k in FORWARDED_HEADERS}
+        self._send_raw(status, raw, kept, started)
+
+    def _dispatch(self, method):
+        started = time.perf_counter()
+        url = urlsplit(self.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        try:
+            # Consume the body before anything can fail, or its bytes would be
+            # parsed as the next request on this keep-alive connection
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+            except ValueError:
+                self.close_connection = True  # can't tell where the body ends
+                raise ApiError(400, "bad Content-Length")
+            body = self.rfile.read(length) if length > 0 else b""
+
+            if USER_PATH.match(url.path):
+                self._forward(method, url, query, body, started)
+            elif url.path == "/leaderboard" and method == "GET":
+                self._send(200, get_leaderboard(query), started, etag_check=True)
+            elif url.path == "/route" and method == "GET":
+                route = get_route(query)
+                if query.get("redirect") and route["app"]:
+                    self.send_response(307)
+                    self.send_header("Location", route["app"])
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                else:
+                    self._send(200, route, started)
+            else:
+                raise ApiError(404, "not found")
+        except ApiError as e:
+            self._send(e.status, {"error": e.message}, started)
+        except Exception as e:
+            # Always answer: a dropped connection looks like a network fault to clients
+            self._send(500, {"error": f"internal error: {type(e).__name__}"}, started)
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_PUT(self):
+        self._dispatch("PUT")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+
+def make_router(host="127.0.0.1", port=8600, verbose=False):
+    server = ThreadingHTTPServer((host, port), RouterHandler)
+    server.daemon_threads = True
+    server.verbose = verbose
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Route API calls to partition owners.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+    if not NODES:
+        parser.error("set WORKOUT_NODES to the partition API URLs")
+
+    server = make_router(args.host, args.port, args.verbose)
+    print(f"Routing {len(NODES)} partitions on http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,61 +1,126 @@
-from exercises import (
-    delts, chest, biceps, butt,
-    back_lats, back_mids, back_lower, back_combo,
-    abs_upper, abs_lower, abs_combo,
-    triceps, calf, thighs
+"""
+Headless bulk schedule generator.
+
+    python schedGenerator.py members.csv [--output store|FILE.json|FILE.csv] [--workers N]
+
+members.csv has a `name` column and an optional `team` column. Every member
+is assigned to their team (or trains individually when `team` is blank),
+and one 4-week schedule is generated per schedule key, formatted with the
+first listed member's weights. Generation is spread over a process pool.
+With --output store (the default) schedules are saved through helpers;
+otherwise they are written to a JSON or CSV file.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from helpers import (
+    build_user_day_from_base,
+    flush_writes,
+    generate_base_day,
+    save_user_schedule,
+    set_user_team,
 )
-from helpers import pick_unique_exercise
-from helpers import pick_unique_exercise, prompt_weight_updates, load_weights
-
-
-# a simple helper so we don't repeat all the print lines manually
-def print_week(week_num, phase_label):
-    print(f"\n\n🏋️‍♀️ Week {week_num} – {phase_label}\n")
-
-    print("DAY 1 - UPPER BODY")
-    print("Delts:       ", pick_unique_exercise("Delts", delts, week_num))
-    print("Chest:       ", pick_unique_exercise("Chest", chest, week_num))
-    print("Biceps:      ", pick_unique_exercise("Biceps", biceps, week_num))
-    print("Butt:        ", pick_unique_exercise("Butt", butt, week_num))
-    print("Upper Back:  ", pick_unique_exercise("Upper Back", back_lats, week_num))
-    print("Abs/Upper:   ", pick_unique_exercise("Abs/Upper", abs_upper, week_num))
-
-    print("\nDAY 2 - FULL BODY")
-    print("Triceps:     ", pick_unique_exercise("Triceps", triceps, week_num))
-    print("Chest:       ", pick_unique_exercise("Chest", chest, week_num))
-    print("Abs/Lower:   ", pick_unique_exercise("Abs/Lower", abs_lower, week_num))
-    print("Back:        ", pick_unique_exercise("Back Lower", back_lower, week_num))
-    print("Calves:      ", pick_unique_exercise("Calves", calf, week_num))
-    print("Thighs:      ", pick_unique_exercise("Thighs", thighs, week_num))
-
-    print("\nDAY 3 - UPPER BODY")
-    print("Delts:       ", pick_unique_exercise("Delts", delts, week_num))
-    print("Chest:       ", pick_unique_exercise("Chest", chest, week_num))
-    print("Biceps:      ", pick_unique_exercise("Biceps", biceps, week_num))
-    print("Butt:        ", pick_unique_exercise("Butt", butt, week_num))
-    print("Upper Back:  ", pick_unique_exercise("Upper Back", back_mids, week_num))
-    print("Abs/Upper:   ", pick_unique_exercise("Abs/Upper", abs_combo, week_num))
-
-    print("\nDAY 4 - FULL BODY")
-    print("Triceps:     ", pick_unique_exercise("Triceps", triceps, week_num))
-    print("Chest:       ", pick_unique_exercise("Chest", chest, week_num))
-    print("Abs/Lower:   ", pick_unique_exercise("Abs/Lower", abs_lower, week_num))
-    print("Back:        ", pick_unique_exercise("Back Combo", back_combo, week_num))
-    print("Calves:      ", pick_unique_exercise("Calves", calf, week_num))
-    print("Thighs:      ", pick_unique_exercise("Thighs", thighs, week_num))
-
-
-# -----------------------------
-# generate all 4 weeks in one run
-# -----------------------------
-print_week(1, "Build Phase (4–6 reps)")
-
-# ---- Week 1 update ----
-prompt_weight_updates()
-
-# 🔁 reload weights after updates
-current_weights = load_weights()
-
-print_week(2, "Strength Phase (6–8 reps)")
-print_week(3, "Hypertrophy Phase (8–10 reps)")
-print_week(4, "Deload / Endurance Phase (12–15 reps)")
\ No newline at end of file
+
+WEEKS = DAYS = range(1, 5)
+
+
+def read_members(path):
+    """{schedule_key: [member names]} in file order."""
+    groups = {}
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            name = (row.get("name") or "").strip()
+            if not name:
+                continue
+            team = (row.get("team") or "").strip()
+            key = team.lower() if team else name.lower()
+            groups.setdefault(key, []).append((name, team))
+    return groups
+
+
+def generate_schedule(schedule_key, format_user):
+    """A full {week: {day: {group: text}}} schedule with string keys, as stored."""
+    return {
+        str(week): {
+            str(day): build_user_day_from_base(generate_base_day(week, day), week, format_user)
+            for day in DAYS
+        }
+        for week in WEEKS
+    }
+
+
+def _job(args):
+    schedule_key, members, to_store = args
+    schedule = generate_schedule(schedule_key, members[0][0])
+    if to_store:
+        save_user_schedule(schedule_key, schedule)
+        for name, team in members:
+            set_user_team(name, team or None)
+        # Pool workers exit via os._exit, skipping the atexit flush of queued writes
+        flush_writes()
+        return schedule_key, None
+    return schedule_key, schedule
+
+
+def write_json(path, results):
+    with open(path, "w") as f:
+        f.write("{")
+        for i, (key, schedule) in enumerate(results):
+            f.write(("," if i else "") + json.dumps(key) + ":" + json.dumps(schedule))
+        f.write("}")
+
+
+def write_csv(path, results):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["schedule_key", "week", "day", "group", "text"])
+        for key, schedule in results:
+            for week, days in schedule.items():
+                for day, plan in days.items():
+                    for group, text in plan.items():
+                        writer.writerow([key, week, day, group, text])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate schedules for many users/teams.")
+    parser.add_argument("members_csv")
+    parser.add_argument("--output", default="store",
+                        help="'store' (default) or a .json / .csv file path")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunksize", type=int, default=16)
+    args = parser.parse_args(argv)
+
+    groups = read_members(args.members_csv)
+    to_store = args.output == "store"
+    if not to_store and not args.output.endswith((".json", ".csv")):
+        parser.error("--output must be 'store' or end in .json/.csv")
+
+    started = time.perf_counter()
+    jobs = [(key, members, to_store) for key, members in groups.items()]
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        results = pool.map(_job, jobs, chunksize=args.chunksize)
+        if to_store:
+            for _ in results:
+                pass
+        elif args.output.endswith(".json"):
+            write_json(args.output, results)
+        else:
+            write_csv(args.output, results)
+    elapsed = time.perf_counter() - started
+
+    n_members = sum(len(m) for m in groups.values())
+    print(f"Generated {len(groups)} schedules for {n_members} members "
+          f"in {elapsed:.2f}s with {args.workers} workers "
+          f"({len(groups) / elapsed:.0f} schedules/s, {n_members / elapsed:.0f} members/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Copy-on-write schedules shared across Streamlit sessions.
+
+A team's saved schedule is frozen once per (schedule key, file version)
+into read-only mappings with interned strings, and every session training
+on that team holds a reference to the same object. What a session owns is
+a ScheduleView: that reference plus a small per-user overlay (custom
+exercises, persisted in their schedule_overlay.json). Cells are shown with
+the viewing user's own weights, computed on demand from their progression
+plan rather than stored per session.
+"""
+
+import sys
+import threading
+from types import MappingProxyType
+
+from helpers import (
+    fresh_reads,
+    get_schedule_version,
+    load_user_data,
+    load_user_schedule,
+    save_user_data,
+    save_user_schedule,
+    update_lock,
+)
+from progression import get_prescriptions, prescription_text
+
+_EMPTY = MappingProxyType({})
+
+_interned = {}  # {schedule_key: (version, frozen_schedule)}
+_lock = threading.Lock()
+
+
+def _freeze(raw):
+    """{week: {day: {group: text}}} with int keys, read-only and string-interned."""
+    weeks = {}
+    for w_key, days in raw.items():
+        try:
+            week = int(w_key)
+        except (TypeError, ValueError):
+            continue
+        if not isinstance(days, dict):
+            continue
+        frozen_days = {}
+        for d_key, plan in days.items():
+            try:
+                day = int(d_key)
+            except (TypeError, ValueError):
+                continue
+            frozen_days[day] = MappingProxyType({
+                sys.intern(str(group)): sys.intern(str(text))
+                for group, text in (plan or {}).items()
+            })
+        weeks[week] = MappingProxyType(frozen_days)
+    return MappingProxyType(weeks)
+
+
+def get_shared_schedule(schedule_key):
+    """The interned, read-only schedule for a key at its current version."""
+    version = get_schedule_version(schedule_key)
+    entry = _interned.get(schedule_key)
+    if entry is not None and entry[0] == version:
+        return entry[1]
+
+    with _lock:
+        entry = _interned.get(schedule_key)
+        if entry is None or entry[0] != version:
+            entry = (version, _freeze(load_user_schedule(schedule_key)))
+            _interned[schedule_key] = entry
+    return entry[1]
+
+
+def _overlay_key(week, day):
+    return f"{week}_{day}"
+
+
+class ScheduleView:
+    """A session's handle on a shared schedule: base reference + per-user overlay."""
+
+    __slots__ = ("schedule_key", "user", "base", "overlay")
+
+    def __init__(self, schedule_key, user):
+        self.schedule_key = schedule_key
+        self.user = user
+        self.base = get_shared_schedule(schedule_key)
+        self.overlay = load_user_data(user, "schedule_overlay")  # {"W_D": {group: text}}
+
+    def refresh(self):
+        """Re-point at the latest shared version (cheap when nothing changed)."""
+        self.base = get_shared_schedule(self.schedule_key)
+
+    def has_day(self, week, day):
+        return day in self.base.get(week, _EMPTY)
+
+    def day(self, week, day):
+        """
+        A fresh {group: text} dict for this user: shared cells re-formatted with
+        their own weights, then their custom exercises on top.
+        """
+        plan = get_prescriptions(self.user)
+        cells = {}
+        for group, text in self.base.get(week, _EMPTY).get(day, _EMPTY).items():
+            name = text.split(" — ")[0].strip()
+            if group.endswith("(Custom)") or name not in plan["index"]:
+                cells[group] = text
+            else:
+                cells[group] = prescription_text(plan, name, week)
+        cells.update(self.overlay.get(_overlay_key(week, day), {}))
+        return cells
+
+    # --- writes go to the shared store (or the user's overlay), never in place ---
+
+    def save_day(self, week, day, day_plan):
+        with update_lock("schedule", self.schedule_key), fresh_reads():
+            latest = load_user_schedule(self.schedule_key)
+            latest.setdefault(str(week), {})[str(day)] = dict(day_plan)
+            save_user_schedule(self.schedule_key, latest)
+        self.refresh()
+
+    def clear_week(self, week):
+        with update_lock("schedule", self.schedule_key), fresh_reads():
+            latest = load_user_schedule(self.schedule_key)
+            latest.pop(str(week), None)
+            save_user_schedule(self.schedule_key, latest)
+        self.refresh()
+
+    def add_custom(self, week, day, group, text):
+        self.overlay.setdefault(_overlay_key(week, day), {})[group] = text
+        save_user_data(self.user, "schedule_overlay", self.overlay)
+
+
+def session_view(state, schedule_key, user):
+    """
+    The session's ScheduleView, kept in `state` (st.session_state) and
+    rebuilt when the schedule key or the viewer changes: teammates share a
+    schedule key but not an overlay or weights. Refreshed before returning.
+    """
+    view = state.get("schedule_view")
+    if view is None or (view.schedule_key, view.user) != (schedule_key, user):
+        view = state["schedule_view"] = ScheduleView(schedule_key, user)
+    view.refresh()
+    return view
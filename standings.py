@@ -0,0 +1,84 @@
+"""
+Leaderboard standings, independent of the UI.
+
+build_progress_snapshot() aggregates every user's completion bits and
+windowed activity counts in one vectorized pass. The Streamlit leaderboard,
+the JSON API and the router (for partitioned deployments) all use it, so
+none of the servers needs to import Streamlit.
+"""
+
+import time
+
+import numpy as np
+
+from helpers import (
+    DAYS_PER_WEEK,
+    WEEKS_PER_CYCLE,
+    WEEK_MASK,
+    load_many,
+    load_completion_mask,
+    load_activity_timestamps,
+    count_activity_between,
+    timestamp_to_epoch,
+)
+
+# Rolling windows → length in days ("cycle" = since the user's current cycle began)
+WINDOWS = {
+    "This cycle": "cycle",
+    "Last 7 days": 7,
+    "Last 30 days": 30,
+    "All time": None,
+}
+
+WEEKS = ["Week 1", "Week 2", "Week 3", "Week 4"]
+
+# popcount of every 4-bit week nibble, and each week's bit offset in a mask
+_NIBBLE_POPCOUNT = np.array([bin(i).count("1") for i in range(1 << DAYS_PER_WEEK)], dtype=np.int64)
+_WEEK_SHIFTS = np.arange(WEEKS_PER_CYCLE, dtype=np.uint16) * DAYS_PER_WEEK
+
+
+def _window_start(window, meta, now):
+    span = WINDOWS[window]
+    if span == "cycle":
+        return timestamp_to_epoch(meta.get("cycle_started"))
+    if span is None:
+        return None
+    return now - span * 86400
+
+
+def build_progress_snapshot(users, window="This cycle", now=None):
+    """
+    {user: {"team": str, "completed": int, "window": int, "weeks": {Week X: count}}}
+    "completed"/"weeks" cover the current cycle; "window" counts the chosen window.
+    """
+    now = time.time() if now is None else now
+    progress_data = {}
+
+    # Read every user's completion bits + meta concurrently instead of 2×N sequential reads
+    loaded = load_many(users, ["completion", "meta"])
+
+    # One vectorized pass over all users: (n_users, 4) per-week popcounts
+    masks = np.fromiter(
+        (load_completion_mask(user, files["completion"]) for user, files in zip(users, loaded)),
+        dtype=np.uint16,
+        count=len(users),
+    )
+    week_matrix = _NIBBLE_POPCOUNT[(masks[:, None] >> _WEEK_SHIFTS) & WEEK_MASK]
+    totals = week_matrix.sum(axis=1)
+
+    for i, (user, files) in enumerate(zip(users, loaded)):
+        team = files["meta"].get("team") or "(Individual)"
+
+        # Windowed count = two bisects on the user's sorted activity index
+        window_count = count_activity_between(
+            load_activity_timestamps(user), _window_start(window, files["meta"], now)
+        )
+
+        progress_data[user] = {
+            "team": team,
+            "completed": int(totals[i]),
+            "window": window_count,
+            "weeks": dict(zip(WEEKS, week_matrix[i].tolist())),
+        }
+
+    return progress_data
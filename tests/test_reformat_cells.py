@@ -0,0 +1,98 @@
+"""
+update_weight re-formats only the stored cells showing the changed
+exercise, so its cost follows the cells touched, not the schedule size.
+
+    python -m pytest tests/
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import helpers
+import progression
+from helpers import (
+    get_all_exercises,
+    load_user_schedule,
+    save_user_schedule,
+    save_weights,
+    set_user_team,
+    update_weight,
+)
+from utils.invalidation import LocalGenerationNotifier
+
+CELLS_PER_EXERCISE = 16  # one cell per day, 4 weeks x 4 days
+
+
+def _schedule(names, groups):
+    """{week: {day: {group: text}}}; only "Group 0" shows names[0]."""
+    return {
+        str(w): {
+            str(d): {
+                f"Group {g}": f"{names[1 + (g + d) % (len(names) - 1)] if g else names[0]} — 100 lbs"
+                for g in range(groups)
+            }
+            for d in range(1, 5)
+        }
+        for w in range(1, 5)
+    }
+
+
+@pytest.fixture
+def formatted(tmp_path, monkeypatch):
+    """Run in an empty data dir and count prescription_text calls."""
+    monkeypatch.chdir(tmp_path)
+    helpers.set_change_notifier(LocalGenerationNotifier())
+    calls = [0]
+    original = progression.prescription_text
+
+    def counting(*args):
+        calls[0] += 1
+        return original(*args)
+
+    monkeypatch.setattr(progression, "prescription_text", counting)
+    yield calls
+    helpers.set_change_notifier(LocalGenerationNotifier())
+
+
+@pytest.fixture
+def names(formatted):
+    return sorted(get_all_exercises())
+
+
+@pytest.mark.parametrize("groups", [6, 60, 600])
+def test_update_weight_formats_only_affected_cells(formatted, names, groups):
+    user = f"lifter{groups}"
+    target = names[0]
+    schedule = _schedule(names, groups)
+    save_user_schedule(user, schedule)
+    save_weights(user, {target: 100.0})
+
+    formatted[0] = 0
+    update_weight(user, target, 135)
+
+    assert formatted[0] == CELLS_PER_EXERCISE
+    after = load_user_schedule(user)
+    changed = [
+        (w, d, g) for w, days in schedule.items() for d, plan in days.items()
+        for g, text in plan.items() if after[w][d][g] != text
+    ]
+    assert len(changed) == CELLS_PER_EXERCISE
+    assert all(g == "Group 0" for _, _, g in changed)
+    assert after["1"]["1"]["Group 0"].startswith(f"{target} — 135 lbs")
+
+
+def test_update_weight_leaves_team_schedule_alone(formatted, names):
+    target = names[0]
+    schedule = _schedule(names, 6)
+    set_user_team("teammate", "Test Team")
+    save_user_schedule("test team", schedule)
+
+    formatted[0] = 0
+    update_weight("teammate", target, 95)
+
+    assert formatted[0] == 0
+    assert load_user_schedule("test team") == schedule
@@ -0,0 +1,120 @@
+import json
+import struct
+import sys
+import zlib
+from array import array
+
+# =========================
+# Stored-file codecs
+# =========================
+# New files start with a 4-byte header: b"WS" + format version + codec id.
+# Anything without the header is a legacy plain-JSON file (what every file
+# looked like before this layer), so old and new files can sit side by side
+# and are read transparently. File names don't change.
+
+MAGIC = b"WS"
+FORMAT_VERSION = 1
+
+CODEC_JSON = 1      # compact JSON, no indentation
+CODEC_ZLIB = 2      # compact JSON, zlib-compressed
+CODEC_RECORDS = 3   # binary {name: float} records
+
+CODEC_IDS = {"json": CODEC_JSON, "zlib": CODEC_ZLIB, "records": CODEC_RECORDS}
+
+COMPRESS_MIN_BYTES = 4096  # "auto" only compresses payloads bigger than this
+
+_COUNT = struct.Struct("<I")
+_NAME_SEP = "\x00"
+
+
+def _compact_json(data):
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _is_float_map(data):
+    # Floats only: records store float64, so ints (masks, cycle numbers, ids)
+    # would come back as floats and lose precision above 2**53
+    return (
+        isinstance(data, dict)
+        and bool(data)
+        and all(type(v) is float for v in data.values())
+        and not any(_NAME_SEP in str(k) for k in data)
+    )
+
+
+def _encode_records(data):
+    """count, then every value as a packed float64, then the NUL-joined names."""
+    values = array("d", (float(v) for v in data.values()))
+    if sys.byteorder != "little":
+        values.byteswap()
+    names = _NAME_SEP.join(str(k) for k in data).encode("utf-8")
+    return _COUNT.pack(len(data)) + values.tobytes() + names
+
+
+def _decode_records(payload):
+    (count,) = _COUNT.unpack_from(payload, 0)
+    end = _COUNT.size + 8 * count
+    if len(payload) < end:
+        raise struct.error("truncated records payload")
+    values = array("d")
+    values.frombytes(payload[_COUNT.size:end])
+    if sys.byteorder != "little":
+        values.byteswap()
+    names = payload[end:].decode("utf-8").split(_NAME_SEP) if count else []
+    if len(names) != count:
+        raise struct.error("record name count mismatch")
+    return dict(zip(names, values))
+
+
+def encode(data, codec="auto"):
+    """
+    Serialize data to bytes.
+    codec: "auto" (records for flat float maps, zlib for large payloads,
+    otherwise compact JSON), "json", "zlib", "records", or "legacy"
+    (indented JSON, no header — the pre-codec format).
+    """
+    if codec == "legacy":
+        return json.dumps(data, indent=4).encode("utf-8")
+
+    if codec == "auto":
+        if _is_float_map(data):
+            codec = "records"
+        else:
+            payload = _compact_json(data)
+            codec = "zlib" if len(payload) > COMPRESS_MIN_BYTES else "json"
+    if codec == "records" and not _is_float_map(data):
+        codec = "json"
+
+    codec_id = CODEC_IDS[codec]
+    if codec_id == CODEC_RECORDS:
+        payload = _encode_records(data)
+    elif codec_id == CODEC_ZLIB:
+        payload = zlib.compress(_compact_json(data), 6)
+    else:
+        payload = _compact_json(data)
+    return MAGIC + bytes([FORMAT_VERSION, codec_id]) + payload
+
+
+def decode(raw):
+    """
+    Deserialize bytes written by encode() or by the legacy json.dump helpers.
+    Raises ValueError on corrupt input.
+    """
+    if not raw:
+        return {}
+    if raw[:2] != MAGIC:
+        text = raw.decode("utf-8").strip()
+        return json.loads(text) if text else {}
+
+    version, codec_id = raw[2], raw[3]
+    if version > FORMAT_VERSION:
+        raise ValueError(f"Unsupported storage format version {version}")
+    payload = raw[4:]
+    try:
+        if codec_id == CODEC_RECORDS:
+            return _decode_records(payload)
+        if codec_id == CODEC_ZLIB:
+            payload = zlib.decompress(payload)
+    except (zlib.error, struct.error) as e:
+        raise ValueError(f"Corrupt payload for codec {codec_id}: {e}") from e
+    return json.loads(payload.decode("utf-8")) if payload else {}
@@ -0,0 +1,113 @@
+import hashlib
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows: bumps are best-effort without an advisory lock
+    fcntl = None
+
+
+# =========================
+# Change notifiers
+# =========================
+# A notifier hands out a generation number per key (we key by file path).
+# Writers bump it after every save; readers remember the generation they
+# cached and re-read the file once it moves.
+
+
+class LocalGenerationNotifier:
+    """In-memory generations. Stand-in for single-process runs and tests."""
+
+    def __init__(self):
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def generation(self, key):
+        return self._generations.get(key, 0)
+
+    def bump(self, key):
+        with self._lock:
+            gen = self._generations.get(key, 0) + 1
+            self._generations[key] = gen
+            return gen
+
+
+class FileGenerationNotifier:
+    """
+    One small counter file per key, shared by every process on the host
+    (or on a shared volume). Checking a key costs a single tiny read.
+
+    Counters are sharded two hash levels down (root/ab/cd/<key>.gen), like
+    the data files themselves, so no directory grows with the number of
+    stored files. Counters from the old flat layout (root/<key>.gen) are
+    still read, and moved into the sharded tree on their key's next bump.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    @staticmethod
+    def _name(key):
+        return key.replace(os.sep, "__").replace("/", "__") + ".gen"
+
+    def _path(self, key):
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.root, digest[:2], digest[2:4], self._name(key))
+
+    def _legacy_path(self, key):
+        return os.path.join(self.root, self._name(key))
+
+    @staticmethod
+    def _read(path):
+        with open(path, "r") as f:
+            return int(f.read().strip() or 0)
+
+    def generation(self, key):
+        try:
+            return self._read(self._path(key))
+        except FileNotFoundError:
+            pass
+        except ValueError:
+            return 0
+        try:
+            return self._read(self._legacy_path(key))
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def bump(self, key):
+        """Increment under an exclusive lock so concurrent writers never collide."""
+        path = self._path(key)
+        try:
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            raw = os.read(fd, 32).strip()
+            legacy = None
+            if not raw:
+                # New sharded counter: continue from the flat one so generations never go back
+                legacy = self._legacy_path(key)
+                try:
+                    raw = str(self._read(legacy)).encode()
+                except (FileNotFoundError, ValueError):
+                    legacy = None
+            try:
+                gen = int(raw or 0) + 1
+            except ValueError:
+                gen = 1
+            os.lseek(fd, 0, os.SEEK_SET)
+            os.ftruncate(fd, 0)
+            os.write(fd, str(gen).encode())
+            if legacy:
+                try:
+                    os.remove(legacy)
+                except FileNotFoundError:
+                    pass
+            return gen
+        finally:
+            os.close(fd)  # also releases the flock
@@ -1,32 +1,68 @@
 import streamlit as st
-from helpers import get_all_users
+from helpers import get_team_index_version, get_user_team, search_teams, set_user_team
+from partitioning import foreign_owner
+
+INDIVIDUAL = "(Individual)"
+NEW_TEAM = "Create New Team"
+TEAM_PICKER_LIMIT = 20
+
+
+def _team_options(query):
+    """Top team matches for `query`, cached in the session until the team index changes."""
+    version = get_team_index_version()
+    cached = st.session_state.get("team_search")
+    if cached is None or cached[:2] != (query, version):
+        cached = (query, version, search_teams(query, TEAM_PICKER_LIMIT))
+        st.session_state["team_search"] = cached
+    return cached[2]
+
 
 def login_user():
-    """Simple login + team selection dropdown."""
+    """Simple login + searchable team picker."""
     st.sidebar.title("👋 Login")
 
     username = st.sidebar.text_input("Your Name:")
+    current_team = get_user_team(username) if username else None
 
-    # Get existing teams/users
-    all_users = get_all_users()
-    all_users = sorted(set(all_users)) if all_users else []
+    # Only the top matches go to the browser, however many teams exist
+    query = st.sidebar.text_input("Find your team:", placeholder="Start typing a team name")
+    teams = _team_options(query.strip())
+    if current_team and current_team not in teams:
+        teams = [current_team] + teams
 
-    team_choice = st.sidebar.selectbox(
-        "Select Team or Mode:",
-        ["(Individual)"] + all_users + ["Create New Team"],
-        index=0,
-    )
+    options = [INDIVIDUAL] + teams + [NEW_TEAM]
+    # Start each name on their recorded team; keyed so the choice survives option changes
+    if st.session_state.get("team_choice_user") != username or st.session_state.get("team_choice") not in options:
+        st.session_state["team_choice_user"] = username
+        st.session_state["team_choice"] = current_team or INDIVIDUAL
+    team_choice = st.sidebar.selectbox("Select Team or Mode:", options, key="team_choice")
 
-    if team_choice == "(Individual)":
-        schedule_key = username.strip().lower()
-    elif team_choice == "Create New Team":
+    if team_choice == INDIVIDUAL:
+        team_name = None
+    elif team_choice == NEW_TEAM:
         new_team = st.sidebar.text_input("Enter new team name:")
-        schedule_key = new_team.strip().lower() if new_team else username.strip().lower()
+        team_name = new_team.strip() or None
     else:
-        schedule_key = team_choice.strip().lower()
+        team_name = team_choice
 
     if not username:
         st.warning("Please enter your name to continue.")
         return None, None
 
+    schedule_key = team_name.strip().lower() if team_name else username.strip().lower()
+
+    # Partitioned deployments: a team's data lives on exactly one node, so
+    # send the user there before anything (even their team choice) is written here
+    owner = foreign_owner(schedule_key)
+    if owner:
+        st.warning(f"**{schedule_key}** is served from another node.")
+        if owner.startswith("http"):
+            st.link_button("Open your team's node", owner)
+        st.stop()
+
+    # Record membership so the team shows up in everyone's picker
+    naming_new_team = team_choice == NEW_TEAM and not team_name
+    if not naming_new_team and team_name != current_team:
+        set_user_team(username, team_name)
+
     return username, schedule_key
@@ -0,0 +1,50 @@
+import threading
+from collections import OrderedDict
+
+
+# =========================
+# Bounded in-process caches
+# =========================
+# The read cache and the per-user caches built on it (progression plans,
+# analytics frames, activity indexes, schedule cell indexes) would otherwise
+# keep an entry for every file or user the process has ever touched. Each
+# holds at most `maxsize` entries and drops the least recently used one
+# when full.
+
+
+class LRUCache:
+    """A dict-like mapping holding at most `maxsize` entries. Thread-safe."""
+
+    def __init__(self, maxsize):
+        self.maxsize = max(1, int(maxsize))
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return default
+            return self._data[key]
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
@@ -0,0 +1,79 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+
+# =========================
+# Lightweight rerun instrumentation
+# =========================
+# Process-wide rolling timings per named section (login, a view, a fragment,
+# ...) plus free-form status values, so reruns can be compared before/after
+# a change. Shown in the sidebar when WORKOUT_SHOW_TIMINGS=1.
+
+MAX_SAMPLES = 500
+
+_timings = {}   # {name: deque[seconds]}
+_counts = {}    # {name: total runs}
+_status = {}    # {name: value}
+_lock = threading.Lock()
+
+
+def record(name, seconds):
+    with _lock:
+        _timings.setdefault(name, deque(maxlen=MAX_SAMPLES)).append(seconds)
+        _counts[name] = _counts.get(name, 0) + 1
+
+
+@contextmanager
+def timed(name):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - started)
+
+
+def timed_fn(name):
+    """Decorator form of timed()."""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with timed(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def set_status(name, value):
+    with _lock:
+        _status[name] = value
+
+
+def get_status():
+    with _lock:
+        return dict(_status)
+
+
+def timing_summary():
+    """{name: {"runs", "p50_ms", "p95_ms", "last_ms"}} over the recent samples."""
+    with _lock:
+        snapshot = {name: sorted(samples) for name, samples in _timings.items()}
+        last = {name: samples[-1] for name, samples in _timings.items()}
+        counts = dict(_counts)
+
+    summary = {}
+    for name, samples in snapshot.items():
+        summary[name] = {
+            "runs": counts[name],
+            "p50_ms": round(samples[len(samples) // 2] * 1000, 2),
+            "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000, 2),
+            "last_ms": round(last[name] * 1000, 2),
+        }
+    return summary
+
+
+def reset():
+    with _lock:
+        _timings.clear()
+        _counts.clear()
@@ -1,21 +1,35 @@
 import streamlit as st
-import time
-import json
 import os
+import time
+import copy
 import streamlit.components.v1 as components
 
 from helpers import (
     generate_base_day,
     build_user_day_from_base,
     mark_workout_done,
-    check_workout_done,
     unmark_workout_done,
-    load_progress,
-    load_user_schedule,
-    save_user_schedule,
+    load_completion_mask,
+    is_workout_done,
+    week_done_count,
+    get_activity_version,
+    get_team_activity_version,
+    get_team_index,
+    fresh_reads,
+    load_set_progress,
+    save_set_progress,
+    add_custom_exercise,
+    load_weights,
+    update_weight,
 )
 
-from exercises import all_groups
+from exercises import get_catalog
+from shared_schedules import session_view
+from catalog import get_catalog_index
+from utils.perf import timed_fn
+
+NEW_EXERCISE = "➕ New exercise…"
+LIVE_POLL_SECONDS = float(os.environ.get("WORKOUT_LIVE_POLL_SECONDS", "5"))
 
 
 def show_daily_workout(username, schedule_key):
@@ -38,29 +52,11 @@ def show_daily_workout(username, schedule_key):
     ]
 
     # =========================
-    # 📂 Load & normalize schedule
+    # 📂 Shared schedule (copy-on-write)
     # =========================
-    if "weekly_schedule" not in st.session_state or st.session_state.get("active_user") != shared_key:
-        raw = load_user_schedule(shared_key) or {}
-        normalized = {}
-
-        # Normalize JSON keys (strings → ints)
-        for w_key, days in raw.items():
-            try:
-                w = int(w_key)
-            except (TypeError, ValueError):
-                continue
-            normalized[w] = {}
-            if isinstance(days, dict):
-                for d_key, plan in days.items():
-                    try:
-                        d = int(d_key)
-                    except (TypeError, ValueError):
-                        continue
-                    normalized[w][d] = plan
-
-        st.session_state.weekly_schedule = normalized
-        st.session_state.active_user = shared_key
+    # The session keeps only a ScheduleView: a reference to the team's interned
+    # schedule plus this user's small overlay.
+    schedule_view = session_view(st.session_state, shared_key, username)
 
     # =========================
     # 📅 Selectors
@@ -74,15 +70,12 @@ def show_daily_workout(username, schedule_key):
     # =========================
     # 🧠 Get or generate day plan
     # =========================
-    st.session_state.weekly_schedule.setdefault(week, {})
-
-    if day not in st.session_state.weekly_schedule[week]:
+    if not schedule_view.has_day(week, day):
         base_day = generate_base_day(week, day)
         user_day = build_user_day_from_base(base_day, week, username)
-        st.session_state.weekly_schedule[week][day] = user_day
-        save_user_schedule(shared_key, st.session_state.weekly_schedule)
+        schedule_view.save_day(week, day, user_day)
 
-    day_plan = st.session_state.weekly_schedule[week][day]
+    day_plan = schedule_view.day(week, day)
 
     # =========================
     # 🕒 Rest Timer
@@ -139,43 +132,74 @@ def show_daily_workout(username, schedule_key):
         for group, text in day_plan.items():
             st.write(f"**{group}:** {text}")
 
-    # =========================
-    # ➕ Add Exercise
-    # =========================
-    st.markdown("### ➕ Add Exercise")
+    # Each section below is a fragment: interacting with it reruns only that
+    # section, not login / schedule loading / the rest of the page.
+    _add_exercise_section(schedule_view, week, day)
+    _set_tracking_section(username, week, day, day_plan)
+    _completion_section(username, week, day)
+    if shared_key != username.strip().lower():
+        _team_live_section(username, shared_key, week, day)
 
-    muscle_group = st.selectbox("Muscle Group", list(all_groups.keys()))
-    exercise_names = [e[0] for e in all_groups[muscle_group]]
-    exercise_name = st.selectbox("Exercise", exercise_names)
 
-    default_weight = dict(all_groups[muscle_group]).get(exercise_name, 0)
+# =========================
+# ➕ Add Exercise
+# =========================
+@st.fragment
+@timed_fn("fragment:add_exercise")
+def _add_exercise_section(schedule_view, week, day):
+    st.markdown("### ➕ Add Exercise")
 
-    weight = st.number_input("Weight", value=float(default_weight))
-    sets = st.number_input("Sets", min_value=1, max_value=10, value=3)
-    reps = st.text_input("Reps", "6–8")
+    # Pickers stay outside the form so the exercise list and default weight follow them
+    index = get_catalog_index(schedule_view.schedule_key)
+    muscle_group = st.selectbox("Muscle Group", list(get_catalog().groups))
+    exercise_names = index.by_group.get(muscle_group, []) + [NEW_EXERCISE]
+    exercise_name = st.selectbox("Exercise", exercise_names)
 
-    if st.button("Add Exercise"):
-        day_plan[f"{muscle_group} (Custom)"] = (
-            f"{exercise_name} — {weight} lbs, {sets}×{reps}"
+    if exercise_name == NEW_EXERCISE:
+        exercise_name = st.text_input("New exercise name").strip()
+        default_weight = 0
+    else:
+        # The user's tracked weight if they have one, else the catalog default
+        default_weight = load_weights(schedule_view.user).get(
+            exercise_name, index.entries[exercise_name].get("default_weight", 0)
+        )
+    if not isinstance(default_weight, (int, float)):
+        default_weight = 0  # equipment tags like "band" / "cables"
+
+    with st.form("add_exercise_form"):
+        weight = st.number_input("Weight", value=float(default_weight))
+        sets = st.number_input("Sets", min_value=1, max_value=10, value=3)
+        reps = st.text_input("Reps", "6–8")
+        submitted = st.form_submit_button("Add Exercise")
+
+    if submitted:
+        if not exercise_name:
+            st.warning("Give the new exercise a name first.")
+            return
+        created = exercise_name not in index.entries
+        if created:
+            # Team-defined movement: goes into the team's catalog for everyone
+            add_custom_exercise(schedule_view.schedule_key, exercise_name, muscle_group, weight)
+        # Only a weight the user actually entered is tracked, never the pre-filled one
+        if weight and (created or weight != float(default_weight)):
+            update_weight(schedule_view.user, exercise_name, weight)  # tracks weights + history
+        schedule_view.add_custom(
+            week, day, f"{muscle_group} (Custom)",
+            f"{exercise_name} — {weight} lbs, {sets}×{reps}",
         )
-        save_user_schedule(shared_key, st.session_state.weekly_schedule)
         st.success(f"Added {exercise_name}")
-        st.rerun()
-
-    # =========================
-    # 📊 Set Tracking
-    # =========================
-    SET_PROGRESS_DIR = "user_data"
-    os.makedirs(SET_PROGRESS_DIR, exist_ok=True)
+        st.rerun()  # the workout list and set grid live outside this fragment
 
-    def progress_file(user):
-        return os.path.join(SET_PROGRESS_DIR, f"{user}_setprogress.json")
 
-    if os.path.exists(progress_file(username)):
-        with open(progress_file(username), "r") as f:
-            set_progress = json.load(f)
-    else:
-        set_progress = {}
+# =========================
+# 📊 Set Tracking
+# =========================
+@st.fragment
+@timed_fn("fragment:set_tracking")
+def _set_tracking_section(username, week, day, day_plan):
+    with fresh_reads():  # saved back below
+        set_progress = load_set_progress(username)
+    saved_set_progress = copy.deepcopy(set_progress)
 
     key = f"week{week}_day{day}"
     set_progress.setdefault(key, {})
@@ -192,7 +216,7 @@ def show_daily_workout(username, schedule_key):
                 done = st.checkbox(
                     f"{exercise} – Set {i+1}",
                     value=set_progress[key][exercise][i],
-                    key=f"{exercise}_{week}_{day}_{i}",
+                    key=f"{group}_{exercise}_{week}_{day}_{i}",
                 )
                 set_progress[key][exercise][i] = done
 
@@ -202,28 +226,76 @@ def show_daily_workout(username, schedule_key):
         st.caption(f"Sets complete: {done_count}/3")
         st.markdown("---")
 
-    with open(progress_file(username), "w") as f:
-        json.dump(set_progress, f, indent=2)
+    # Only write when a box actually changed, so the file version stays stable
+    if set_progress != saved_set_progress:
+        save_set_progress(username, set_progress)
 
     st.markdown(f"### 🔥 Overall Progress: {total_done}/{total_sets} sets complete")
 
-    # =========================
-    # ✅ Completion
-    # =========================
-    if check_workout_done(username, week, day):
+
+# =========================
+# ✅ Completion + 📈 Weekly Progress
+# =========================
+# One fragment: the weekly bar has to refresh whenever completion changes.
+@st.fragment
+@timed_fn("fragment:completion")
+def _completion_section(username, week, day):
+    # on_click callbacks run before the fragment re-executes, so no extra rerun is needed
+    mask = load_completion_mask(username)
+    if is_workout_done(mask, week, day):
         st.success("✅ Workout complete!")
-        if st.button("↩️ Undo"):
-            unmark_workout_done(username, week, day)
-            st.rerun()
+        st.button("↩️ Undo", on_click=unmark_workout_done, args=(username, week, day))
     else:
-        if st.button("🎉 I Did It!"):
-            mark_workout_done(username, week, day)
-            st.rerun()
-
-    # =========================
-    # 📈 Weekly Progress
-    # =========================
-    progress = load_progress(username)
-    completed = [d for d in range(1, 5) if f"Week {week} Day {d}" in progress]
-    st.progress(len(completed) / 4)
-    st.caption(f"Week {week} progress: {len(completed)}/4 workouts logged.")
+        st.button("🎉 I Did It!", on_click=mark_workout_done, args=(username, week, day))
+
+    completed = week_done_count(mask, week)
+    st.progress(completed / 4)
+    st.caption(f"Week {week} progress: {completed}/4 workouts logged.")
+
+
+# =========================
+# 👥 Live Team Progress
+# =========================
+def _member_status(member, week, day):
+    mask = load_completion_mask(member)
+    day_sets = load_set_progress(member).get(f"week{week}_day{day}", {})
+    return {
+        "done": is_workout_done(mask, week, day),
+        "sets": sum(bool(s) for sets in day_sets.values() for s in sets),
+        "week": week_done_count(mask, week),
+    }
+
+
+@st.fragment(run_every=LIVE_POLL_SECONDS)
+@timed_fn("fragment:team_live")
+def _team_live_section(username, team_key, week, day):
+    # Session cache: {"scope", "version": team counter, "members": {name: (counter, status)}}
+    live = st.session_state.get("team_live")
+    if live is None or live["scope"] != (team_key, week, day):
+        live = {"scope": (team_key, week, day), "version": None, "members": {}}
+        st.session_state["team_live"] = live
+
+    # Nothing changed = one counter read; otherwise re-read only the members that moved
+    version = get_team_activity_version(team_key)
+    if version != live["version"]:
+        roster = get_team_index().get(team_key, {}).get("members", frozenset())
+        members = live["members"]
+        for gone in set(members) - roster:
+            del members[gone]
+        for member in roster:
+            member_version = get_activity_version(member)
+            cached = members.get(member)
+            if cached is None or cached[0] != member_version:
+                members[member] = (member_version, _member_status(member, week, day))
+        live["version"] = version
+
+    if not live["members"]:
+        return
+    st.markdown("### 👥 Team Today")
+    for member, (_, status) in sorted(live["members"].items(), key=lambda m: m[0].lower()):
+        icon = "✅" if status["done"] else "⏳"
+        you = " (you)" if member == username else ""
+        st.markdown(
+            f"{icon} **{member}**{you} — {status['sets']} sets done today · "
+            f"week {week}: {status['week']}/4"
+        )
@@ -1,5 +1,11 @@
 import streamlit as st
-from helpers import generate_base_day, build_user_day_from_base, load_user_schedule, save_user_schedule
+from helpers import (
+    generate_base_day,
+    build_user_day_from_base,
+    get_current_cycle,
+    start_new_cycle,
+)
+from shared_schedules import session_view
 
 def show_full_schedule(username, schedule_key):
     """Display all 4 weeks of workouts."""
@@ -12,20 +18,30 @@ def show_full_schedule(username, schedule_key):
         "Deload / Endurance Phase (12–15 reps)",
     ]
 
-    if "weekly_schedule" not in st.session_state:
-        st.session_state.weekly_schedule = load_user_schedule(schedule_key)
+    schedule_view = session_view(st.session_state, schedule_key, username)
+
+    cycle = get_current_cycle(username)
+    st.caption(f"🔁 Cycle {cycle}")
+    if st.button("🔄 Finish Cycle & Start New One"):
+        new_cycle = start_new_cycle(username, schedule_key)
+        st.session_state.pop("schedule_view", None)
+        st.success(f"✅ Cycle {cycle} archived — welcome to cycle {new_cycle}!")
+        st.rerun()
 
     for week_num, phase in enumerate(phase_names, start=1):
         st.markdown(f"## 🏋️ Week {week_num} – {phase}")
         with st.expander(f"View Week {week_num} Workouts"):
             if st.button(f"Regenerate Week {week_num}"):
-                st.session_state.weekly_schedule[week_num] = {}
-                save_user_schedule(schedule_key, st.session_state.weekly_schedule)
+                schedule_view.clear_week(week_num)
                 st.success(f"✅ Week {week_num} regenerated!")
 
             for day_num in range(1, 5):
-                base_day = generate_base_day(week_num, day_num)
-                user_day = build_user_day_from_base(base_day, week_num, username)
+                # Saved days come from the shared schedule; others are a fresh preview
+                if schedule_view.has_day(week_num, day_num):
+                    user_day = schedule_view.day(week_num, day_num)
+                else:
+                    base_day = generate_base_day(week_num, day_num)
+                    user_day = build_user_day_from_base(base_day, week_num, username)
                 st.markdown(f"### Day {day_num}")
                 for group, text in user_day.items():
                     st.write(f"- **{group}:** {text}")
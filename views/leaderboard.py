@@ -1,71 +1,48 @@
 # views/leaderboard.py
 
+import time
+
 import streamlit as st
-from helpers import load_progress, get_user_team, get_all_users
+from helpers import get_all_users
+from partitioning import gather_progress_snapshot, is_partitioned
+from standings import WEEKS, WINDOWS, build_progress_snapshot
 
 
 def show_leaderboard(current_user: str | None = None):
     st.title("🏆 Leaderboard")
 
-    users = get_all_users()
+    window = st.radio("Time Window", list(WINDOWS.keys()), horizontal=True)
+
+    if is_partitioned():
+        # Every node aggregates its own partition; merge them here
+        progress_data, missing = gather_progress_snapshot(window)
+        users = list(progress_data)
+        if missing:
+            st.warning(f"{len(missing)} partition(s) didn't answer; their users are missing below.")
+    else:
+        users = get_all_users()
+        progress_data = build_progress_snapshot(users, window, time.time()) if users else {}
 
     if not users:
         st.info("No users found yet. Once someone logs a workout, the leaderboard will appear here.")
         return
 
-    # =========================
-    # Build per-user progress snapshot
-    # =========================
-    weeks = ["Week 1", "Week 2", "Week 3", "Week 4"]
-
-    progress_data = {}  # {user: {"team": str, "completed": int, "weeks": {Week X: count}}}
-
-    for user in users:
-        progress = load_progress(user)
-        team = get_user_team(user) or "(Individual)"
-
-        # Initialize weekly counts
-        week_counts = {w: 0 for w in weeks}
-        total_completed = 0
-
-        for key in progress.keys():
-            # Expect keys like: "Week 1 Day 3"
-            parts = key.split()
-            if len(parts) != 4 or parts[0] != "Week" or parts[2] != "Day":
-                continue
-
-            try:
-                week_num = int(parts[1])
-            except ValueError:
-                continue
-
-            if 1 <= week_num <= 4:
-                week_label = f"Week {week_num}"
-                week_counts[week_label] += 1
-                total_completed += 1
-
-        progress_data[user] = {
-            "team": team,
-            "completed": total_completed,
-            "weeks": week_counts,
-        }
-
     # =========================
     # Top Performers
     # =========================
     st.subheader("🥇 Top Performers")
 
-    # Sort users by total completed desc, then name
+    # Sort users by workouts completed in the window desc, then name
     sorted_users = sorted(
         progress_data.items(),
-        key=lambda item: (-item[1]["completed"], item[0].lower()),
+        key=lambda item: (-item[1]["window"], item[0].lower()),
     )
 
     if not sorted_users:
         st.info("No workouts logged yet. Once people start checking in, rankings will show here.")
     else:
         for idx, (user, data) in enumerate(sorted_users):
-            total = data["completed"]
+            total = data["window"]
             team = data["team"]
 
             # Choose icon by rank
@@ -78,7 +55,7 @@ def show_leaderboard(current_user: str | None = None):
             else:
                 icon = "🏋️"
 
-            label = f"**{user}** — {total} workouts completed ({team})"
+            label = f"**{user}** — {total} workouts completed, {window.lower()} ({team})"
 
             # Highlight current user if provided
             if current_user and user.lower() == current_user.lower():
@@ -99,14 +76,14 @@ def show_leaderboard(current_user: str | None = None):
     team_totals = {}  # {team_name: total_workouts}
     for user, data in progress_data.items():
         team = data["team"]
-        team_totals[team] = team_totals.get(team, 0) + data["completed"]
+        team_totals[team] = team_totals.get(team, 0) + data["window"]
 
     if team_totals:
         # Sort by total desc
         sorted_teams = sorted(team_totals.items(), key=lambda x: -x[1])
         for idx, (team, total) in enumerate(sorted_teams):
             icon = "🥇" if idx == 0 else "🥈" if idx == 1 else "🥉" if idx == 2 else "🏁"
-            st.markdown(f"{icon} **{team}** — {total} workouts completed total")
+            st.markdown(f"{icon} **{team}** — {total} workouts completed ({window.lower()})")
     else:
         st.info("No team data yet.")
 
@@ -165,7 +142,7 @@ table.leaderboard-table tr:hover {
         table_html += f"<td><strong>{user}</strong></td>"
 
         # For each week: 4 total possible workouts → 4 blocks
-        for w in weeks:
+        for w in WEEKS:
             done = weeks_counts.get(w, 0)
             done = max(0, min(4, done))  # clamp 0-4
             filled = "✅" * done + "⬜" * (4 - done)
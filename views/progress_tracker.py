@@ -1,12 +1,16 @@
 import streamlit as st
 import matplotlib.pyplot as plt
-from helpers import load_weight_history, load_progress
-from exercises import (
-    delts, chest, biceps, butt,
-    back_lats, back_mids, back_lower, back_combo,
-    abs_upper, abs_lower, abs_combo,
-    triceps, calf, thighs
+from helpers import (
+    load_weight_history,
+    load_completion_mask,
+    week_done_count,
+    list_cycles,
+    load_cycle,
+    get_user_team,
 )
+from analytics import get_user_analytics
+from catalog import get_catalog_index
+from reports import FORMATS, request_report
 
 def show_progress_tracker(username):
     """Show charts and weekly progress summary."""
@@ -15,17 +19,17 @@ def show_progress_tracker(username):
     st.markdown("### 💪 Weight Progress Over Time")
     weight_history = load_weight_history(username)
 
-    # Collect all exercise names
-    all_exercises = set()
-    for group in [
-        delts, chest, biceps, butt, back_lats, back_mids, back_lower,
-        back_combo, abs_upper, abs_lower, abs_combo, triceps, calf, thighs
-    ]:
-        for ex, _ in group:
-            all_exercises.add(ex)
-    all_exercises.update(weight_history.keys())
-
-    exercise_names = sorted(all_exercises)
+    # Catalog (built-in + team custom) is indexed once per version; search narrows it
+    index = get_catalog_index(get_user_team(username) or username)
+    query = st.text_input("Search exercises", placeholder="e.g. landmine, curl, press")
+    if query:
+        exercise_names = index.search(query, limit=25)
+        exercise_names += [
+            name for name in weight_history
+            if query.lower() in name.lower() and name not in exercise_names
+        ]
+    else:
+        exercise_names = index.names + sorted(n for n in weight_history if n not in index.entries)
 
     if exercise_names:
         selected = st.selectbox("Choose an exercise to track", exercise_names)
@@ -52,21 +56,97 @@ def show_progress_tracker(username):
     else:
         st.info("No exercises found — complete a workout to start tracking!")
 
+    # --- All-Exercise Dashboard ---
+    analytics = get_user_analytics(username)
+    summary = analytics["summary"]
+    if not summary.empty:
+        st.markdown("### 📊 All-Exercise Dashboard")
+        st.dataframe(
+            summary[["group", "entries", "current", "pr", "e1rm", "slope"]].rename(columns={
+                "group": "Muscle Group",
+                "entries": "Entries",
+                "current": "Current (lbs)",
+                "pr": "PR (lbs)",
+                "e1rm": "Est. 1RM (lbs)",
+                "slope": "Trend (lbs/week)",
+            })
+        )
+
+    weekly_volume = analytics["weekly_volume"]
+    if not weekly_volume.empty:
+        st.markdown("### 🏗️ Weekly Volume by Muscle Group")
+        st.bar_chart(weekly_volume)
+
     st.markdown("---")
 
     # --- Weekly Completion Progress ---
-    progress = load_progress(username)
-    if progress:
+    mask = load_completion_mask(username)
+    if mask:
         st.markdown("### 🏁 Weekly Progress Overview")
-        week_counts = {}
-        for key in progress.keys():
-            week_num = int(key.split()[1])
-            week_counts[week_num] = week_counts.get(week_num, 0) + 1
-
         for week_num in range(1, 5):
-            completed = week_counts.get(week_num, 0)
+            completed = week_done_count(mask, week_num)
             pct = completed / 4
             st.progress(pct)
             st.write(f"**Week {week_num}:** {completed}/4 workouts")
     else:
         st.info("No workouts logged yet. Go smash one! 💪")
+
+    # --- Past Cycles (archived, loaded on demand) ---
+    cycles = list_cycles(username)
+    if cycles:
+        st.markdown("---")
+        st.markdown("### 🗄️ Past Cycles")
+        for cycle_num in sorted(cycles, key=int, reverse=True):
+            summary = cycles[cycle_num]
+            st.write(
+                f"**Cycle {cycle_num}:** {summary.get('workouts_completed', 0)}/16 workouts, "
+                f"{summary.get('sets_completed', 0)} sets "
+                f"(ended {summary.get('ended', '?')})"
+            )
+            if st.toggle("Show details", key=f"cycle_details_{cycle_num}"):
+                archived = load_cycle(username, cycle_num)
+                st.json(archived.get("progress", {}))
+
+    # --- Printable report (rendered off the script thread) ---
+    st.markdown("---")
+    st.markdown("### 🖨️ Printable Report")
+    team = get_user_team(username)
+    scopes = {"Just me": ("user", username)}
+    if team:
+        scopes[f"Team {team}"] = ("team", team)
+    col1, col2 = st.columns(2)
+    scope = col1.radio("Include", list(scopes), horizontal=True)
+    fmt = col2.radio("Format", list(FORMATS), format_func=lambda f: "PDF" if f == "pdf" else "PNG sprite sheet",
+                     horizontal=True)
+    if st.button("Build report"):
+        st.session_state["report"] = (scopes[scope], fmt, request_report(*scopes[scope], fmt))
+
+    pending = st.session_state.get("report")
+    if pending is not None:
+        (_, owner), fmt, future = pending
+        if future.done():
+            _report_download(owner, fmt, future)
+        else:
+            _report_progress(future)  # only mounted (and polling) while rendering
+
+
+@st.fragment(run_every=1.0)
+def _report_progress(future):
+    """Polls the pending report; one full rerun swaps in the download once it's ready."""
+    if future.done():
+        st.rerun()
+    st.caption("⏳ Rendering charts…")
+
+
+def _report_download(owner, fmt, future):
+    try:
+        data = future.result()
+    except Exception as exc:
+        st.error(f"Report failed: {exc}")
+        return
+    st.download_button(
+        f"⬇️ Download {fmt.upper()}",
+        data=data,
+        file_name=f"{owner.replace(' ', '_').lower()}_progress.{fmt}",
+        mime=FORMATS[fmt],
+    )
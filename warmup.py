@@ -0,0 +1,164 @@
+"""
+Background warm-up at server start.
+
+The first visitors after a deploy used to pay for every cold path: the
+catalog build, the user-directory scan and generating days no one had
+opened yet. start_warmup() runs those once in a daemon thread when app.py
+first loads, so the process-wide caches are hot by the time real sessions
+arrive. Each step is timed as "warmup:<step>" and progress is published as
+the "warmup" status (see utils/perf.py).
+
+Only shared, bounded state is warmed (catalogs, team schedules): per-user
+caches (progression, analytics, activity) grow with every user and are
+left to fill on demand. Missing days are generated by one process at a
+time, under an exclusive lock on WARMUP_LOCK_FILE, so concurrently
+starting workers don't overwrite each other's random picks.
+
+Set WORKOUT_WARMUP=0 to skip it.
+"""
+
+import io
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, so days are left to on-demand generation
+    fcntl = None
+
+from helpers import (
+    USER_DIR,
+    build_user_day_from_base,
+    fresh_reads,
+    generate_base_day,
+    get_all_users,
+    get_team_index,
+    load_user_schedule,
+    save_user_schedule,
+)
+from utils.perf import set_status, timed
+
+WEEKS = DAYS = range(1, 5)
+WARMUP_LOCK_FILE = os.path.join(USER_DIR, ".warmup.lock")
+
+_started = False
+_lock = threading.Lock()
+
+
+@fresh_reads()
+def _fill_missing_days(team_key, format_user):
+    """Generate and save every day a team's schedule doesn't have yet. Returns the count."""
+    schedule = load_user_schedule(team_key)
+    missing = 0
+    for week in WEEKS:
+        days = schedule.setdefault(str(week), {})
+        for day in DAYS:
+            if str(day) not in days:
+                days[str(day)] = build_user_day_from_base(generate_base_day(week, day), week, format_user)
+                missing += 1
+    if missing:
+        save_user_schedule(team_key, schedule)
+    return missing
+
+
+def _generate_days_once(teams):
+    """
+    Fill missing days in every team's schedule unless another process is
+    already doing it. Returns the number of days generated (None = skipped).
+    """
+    if fcntl is None:
+        return None
+    fd = os.open(WARMUP_LOCK_FILE, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return None  # another worker holds it; its days will be read from disk
+        return sum(
+            _fill_missing_days(team_key, min(entry["members"], default=team_key))
+            for team_key, entry in teams.items()
+        )
+    finally:
+        os.close(fd)  # also releases the flock
+
+
+def run_warmup():
+    """Run every warm-up step in order; a failing step is reported and skipped."""
+    # Imported here so the thread, not app start-up, pays for them
+    from analytics import compute_analytics
+    from catalog import get_catalog_index
+    from shared_schedules import get_shared_schedule
+
+    started = time.perf_counter()
+    state = {"state": "running", "step": None, "errors": {}}
+    found = {}
+
+    def step(name, fn):
+        state["step"] = name
+        set_status("warmup", dict(state))
+        try:
+            with timed(f"warmup:{name}"):
+                fn()
+        except Exception as exc:  # keep warming the rest; the app works cold anyway
+            state["errors"][name] = repr(exc)
+
+    def scan_users():
+        found["users"] = get_all_users()
+        found["teams"] = get_team_index()
+
+    def build_catalogs():
+        get_catalog_index()
+        for entry in found.get("teams", {}).values():
+            get_catalog_index(entry["name"])
+
+    def generate_days():
+        found["generated"] = _generate_days_once(found.get("teams", {}))
+
+    def prime_caches():
+        for team_key in found.get("teams", {}):
+            get_shared_schedule(team_key)
+
+    def first_render():
+        # One-off costs of the first chart/table: font cache, pandas code paths.
+        # The OO Figure API, since pyplot isn't safe off the script thread.
+        from matplotlib.figure import Figure
+        fig = Figure(figsize=(6, 3))
+        ax = fig.subplots()
+        ax.plot(["2025-01-01", "2025-01-02"], [100.0, 105.0], marker="o")
+        ax.set_title("warmup")
+        fig.savefig(io.BytesIO(), format="png")
+        compute_analytics(
+            {"Landmind Row": [{"date": "2025-01-01 10:00", "weight": 100.0}]},
+            {"week1_day1": {"Landmind Row": [True, False, False]}},
+        )
+
+    step("users", scan_users)
+    step("catalog", build_catalogs)
+    step("days", generate_days)
+    step("caches", prime_caches)
+    step("render", first_render)
+
+    state.update(
+        state="done",
+        step=None,
+        users=len(found.get("users", [])),
+        teams=len(found.get("teams", {})),
+        days_generated=found.get("generated", 0),
+        elapsed_s=round(time.perf_counter() - started, 3),
+    )
+    set_status("warmup", state)
+    return state
+
+
+def start_warmup():
+    """Start the warm-up thread once per process (app.py re-executes every rerun)."""
+    global _started
+    if os.environ.get("WORKOUT_WARMUP", "1") == "0":
+        return
+    with _lock:
+        if _started:
+            return
+        _started = True
+    set_status("warmup", {"state": "queued"})
+    threading.Thread(target=run_warmup, name="workout-warmup", daemon=True).start()